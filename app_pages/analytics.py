@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+import plotly.express as px
+import streamlit as st
+
+from data import fetch_parallel, get_inventory, get_traffic_breakdown
+from daily_stats import period_stats, utc_today
+from perf import span
+
+# --- PAGE 3 : ANALYTICS ---
+st.title("Tableau de Bord Stratégique 🚀")
+
+# 0. PÉRIODE
+PERIODS = {"7 derniers jours": 7, "30 derniers jours": 30, "90 derniers jours": 90, "12 derniers mois": 365}
+today = utc_today()
+c_period, c_dates = st.columns([1, 2])
+period = c_period.selectbox("Période", list(PERIODS) + ["Personnalisée"], index=1)
+if period == "Personnalisée":
+    picked = c_dates.date_input("Du / au", value=(today - timedelta(days=29), today), max_value=today)
+    if len(picked) != 2:
+        st.info("Choisis la date de fin de la période.")
+        st.stop()
+    start, end = picked
+else:
+    start, end = today - timedelta(days=PERIODS[period] - 1), today
+    c_dates.caption(f"Du {start:%d/%m/%Y} au {end:%d/%m/%Y}")
+
+# 1. CHARGEMENT DES DONNÉES (en parallèle)
+# Agrégats par jour (jours clos gardés en mémoire), trafic agrégé sur la période, noms des produits
+with span("Chargement"):
+    loaded = fetch_parallel(
+        stats=lambda: period_stats(start, end),
+        traffic=lambda: get_traffic_breakdown(start, end),
+        inventory=get_inventory,
+    )
+stats, df_traffic, df_inv = loaded["stats"], loaded["traffic"], loaded["inventory"]
+daily = stats["jours"]
+
+def traffic_counts(dimension):
+    counts = df_traffic[df_traffic['dimension'] == dimension]
+    return counts.rename(columns={'value': dimension, 'visits': 'count'}).sort_values('count', ascending=False)
+
+# --- SECTION 1 : KPIs DE LA PÉRIODE ---
+st.subheader("Performance de la période")
+
+with span("KPIs"):
+    # Chiffre d'affaires encaissé (commandes livrées) et volume total
+    ca_reel = daily['ca_reel'].sum()
+    nb_total = int(daily['commandes'].sum())
+
+    # Taux de Conversion (Commandes / Visiteurs)
+    nb_visiteurs = int(daily['visiteurs'].sum()) or 1 # Évite division par 0
+    taux_conv = (nb_total / nb_visiteurs) * 100
+
+    kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+    kpi1.metric("Chiffre d'Affaires (Encaissé)", f"{ca_reel:,.0f} CFA", delta="Net Revenue")
+    kpi2.metric("Volume de Commandes", f"{nb_total}", help="Toutes commandes confondues")
+    kpi3.metric("Visiteurs Totaux", f"{nb_visiteurs}", help="Basé sur les logs")
+    kpi4.metric("Taux de Conversion", f"{taux_conv:.2f} %")
+
+# --- SECTION 2 : ÉVOLUTION JOUR PAR JOUR ---
+with span("Évolution"):
+    series = daily.reset_index()
+    g1, g2, g3 = st.tabs(["💰 Chiffre d'affaires", "📦 Commandes", "🎯 Conversion"])
+    with g1:
+        fig_ca = px.area(series, x='jour', y='ca_reel', title="CA encaissé par jour (CFA)")
+        st.plotly_chart(fig_ca, use_container_width=True)
+    with g2:
+        fig_cmd = px.bar(series, x='jour', y='commandes', title="Commandes par jour")
+        st.plotly_chart(fig_cmd, use_container_width=True)
+    with g3:
+        fig_conv = px.line(series, x='jour', y='conversion', title="Taux de conversion par jour (%)", markers=True)
+        st.plotly_chart(fig_conv, use_container_width=True)
+
+st.divider()
+
+# --- SECTION 3 : ANALYSE DES VENTES ---
+c1, c2 = st.columns(2)
+
+with c1, span("Top Produits"):
+    st.subheader("🏆 Top Produits")
+    if not stats["produits"].empty:
+        # Unités vendues par produit sur la période, avec les noms de l'inventaire
+        names = df_inv.set_index('id')['product_name'] if not df_inv.empty else {}
+        top_products = stats["produits"].rename('quantity_sold').rename_axis('product_id').reset_index()
+        top_products['product_name'] = top_products['product_id'].map(names).fillna("Produit Inconnu")
+        fig_prod = px.bar(top_products, x='quantity_sold', y='product_name', orientation='h', 
+                          title="Unités Vendues par Produit", color='quantity_sold')
+        st.plotly_chart(fig_prod, use_container_width=True)
+
+with c2, span("Statut des Commandes"):
+    st.subheader("📦 Statut des Commandes")
+    if not stats["statuts"].empty:
+        status_counts = stats["statuts"].reset_index()
+        status_counts.columns = ['Statut', 'Nombre']
+        fig_status = px.pie(status_counts, values='Nombre', names='Statut', hole=0.4, 
+                            color='Statut', color_discrete_map={'Livré':'green', 'Annulé (Client)':'red', 'En attente Web':'orange'})
+        st.plotly_chart(fig_status, use_container_width=True)
+
+# --- SECTION 4 : TRAFIC & MARKETING ---
+st.divider()
+st.subheader("🕵️ Analyse du Trafic & Sources")
+
+with span("Trafic"):
+    if not df_traffic.empty:
+        t1, t2 = st.columns(2)
+
+        with t1:
+            st.markdown("**📍 D'où viennent tes visiteurs ?**")
+            source_counts = traffic_counts('source')
+            fig_source = px.pie(source_counts, values='count', names='source', title="Sources de Trafic")
+            st.plotly_chart(fig_source, use_container_width=True)
+
+        with t2:
+            st.markdown("**📱 Quel appareil utilisent-ils ?**")
+            # Graphique Appareil (Mobile vs Desktop)
+            dev_counts = traffic_counts('device_type')
+            fig_dev = px.bar(dev_counts, x='device_type', y='count', color='device_type', title="Sessions par Appareil")
+            st.plotly_chart(fig_dev, use_container_width=True)
+
+        # Graphique OS
+        os_counts = traffic_counts('os')
+        fig_os = px.bar(os_counts, x='os', y='count', title="Système d'Exploitation")
+        st.plotly_chart(fig_os, use_container_width=True)
+
+    else:
+        st.info("En attente de données de trafic... (Vérifiez que le script JS est bien en place)")
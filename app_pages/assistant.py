@@ -0,0 +1,139 @@
+import google.generativeai as genai
+import streamlit as st
+
+from data import fetch_parallel, get_orders, get_inventory
+from perf import span
+from llm_cache import get_analyst_cache, schema_signature
+from sandbox import get_analysis_pool, render_outputs
+from marketing import ANGLES, CONCURRENCY, MAX_BATCH, script_prompt, get_script_model, stream_script, generate_batch
+
+# --- PAGE 4 : ASSISTANT IA (VERSION GEMINI) ---
+st.header("Ton Assistant Intelligent (Propulsé par Gemini) 💎")
+
+# Configuration de la clé API
+if "gemini" in st.secrets:
+    if "api_key" in st.secrets["gemini"]:
+        genai.configure(api_key=st.secrets["gemini"]["api_key"])
+else:
+    st.error("⚠️ Clé Gemini manquante. Ajoute-la dans les secrets (.streamlit/secrets.toml).")
+    st.info("Format: [gemini] api_key = 'AIza...'")
+    st.stop()
+
+# Les deux onglets sont dessinés à chaque passage : on charge leurs données d'un coup
+with span("Chargement"):
+    loaded = fetch_parallel(orders=get_orders, inventory=get_inventory)
+# Démarre les processus d'analyse dès l'ouverture de la page (imports faits avant la 1re question)
+analysis_pool = get_analysis_pool()
+
+tab_cfo, tab_cmo = st.tabs(["📊 Analyste (Talk to Data)", "🎥 Marketing (Content Factory)"])
+
+# --- CERVEAU 1 : L'ANALYSTE (Text-to-Code) ---
+with tab_cfo:
+    st.subheader("Posez une question à vos données")
+    st.caption("Exemples : 'Quel est le produit le plus vendu ?', 'Montre-moi les ventes par source', 'Moyenne des paniers ?'")
+
+    df_orders = loaded["orders"]
+
+    user_question = st.text_area("Ta question :", placeholder="Écris ta question ici...")
+    regenerate = st.checkbox("🔄 Regénérer (ignorer le cache)", help="Redemande le code à Gemini même si la question a déjà été posée")
+    cache = get_analyst_cache()
+    cache_stats = cache.stats()
+    st.caption(f"🗄️ Cache de l'analyste : {cache_stats['réponses']} réponse(s) gardée(s), "
+               f"{cache_stats['réutilisations']} réutilisation(s) sans appel à Gemini")
+
+    if st.button("Analyses-moi ça 🚀"):
+        if user_question and not df_orders.empty:
+            with st.spinner("Gemini réfléchit..."):
+                signature = schema_signature(df_orders)
+                cache_key = None
+                try:
+                    # 0. Question déjà posée (ou presque) sur les mêmes colonnes ?
+                    cached = None if regenerate else cache.get(user_question, signature)
+                    if cached:
+                        cache_key, generated_code, cached_question = cached
+                        st.caption(f"⚡ Code réutilisé depuis le cache (question : « {cached_question} »)")
+                    else:
+                        # 1. Préparation du contexte
+                        columns_info = list(df_orders.columns)
+                        sample_data = df_orders.head(3).to_markdown()
+
+                        prompt = f"""
+                        Tu es un expert en Data Science Python (Pandas/Plotly).
+                        Tu as accès à une DataFrame nommée 'df'.
+                        Colonnes : {columns_info}
+                        Exemple de données :
+                        {sample_data}
+
+                        Question : "{user_question}"
+
+                        Consignes STRICTES :
+                        1. Écris UNIQUEMENT le code Python exécutable. Pas de texte avant ou après.
+                        2. Pas de balises markdown (pas de ```python).
+                        3. Utilise 'st.write()' pour afficher du texte/chiffres.
+                        4. Utilise 'st.plotly_chart()' pour les graphiques (avec plotly.express as px).
+                        5. La variable de données s'appelle 'df'.
+                        """
+
+                        # 2. Appel à Gemini 
+                        model = genai.GenerativeModel('gemini-2.0-flash-lite-preview-02-05')
+                        response = model.generate_content(prompt)
+
+                        # 3. Nettoyage
+                        generated_code = response.text.replace("```python", "").replace("```", "").strip()
+                        cache_key = cache.put(user_question, signature, generated_code)
+
+                    st.code(generated_code, language="python")
+                    st.divider()
+
+                    # 4. Exécution isolée (sur les données du jour, même si le code vient du cache)
+                    render_outputs(analysis_pool.run(generated_code, df_orders))
+
+                except Exception as e:
+                    if cache_key:
+                        cache.discard(cache_key)
+                    st.error(f"Erreur : {e}")
+                    st.caption("Si l'erreur persiste, vérifie ta clé API ou essaie une question plus simple.")
+
+# --- CERVEAU 2 : LE MARKETEUR (Content Gen) ---
+with tab_cmo:
+    st.subheader("Générateur de Scripts Viraux 📱")
+
+    df_inv = loaded["inventory"]
+    product_list = df_inv['product_name'].tolist()
+    script_model = get_script_model()
+    mode = st.radio("Mode", ["Un script", "Série (plusieurs produits × angles)"], horizontal=True)
+
+    if mode == "Un script":
+        selected_prod = st.selectbox("Quel produit veux-tu pousser ?", product_list)
+        angle = st.selectbox("Quel angle marketing ?", ANGLES)
+    else:
+        selected_prods = st.multiselect("Produits", product_list, max_selections=MAX_BATCH)
+        selected_angles = st.multiselect("Angles", ANGLES, default=ANGLES[:1])
+
+    context_perplexity = st.text_area("Info Perplexity (Optionnel)", placeholder="Colle ici une info trouvée sur Perplexity (ex: Tendance TikTok du moment...)")
+
+    if mode == "Un script":
+        if st.button("Génère le script ✨"):
+            # Affichage au fil de l'eau : les premières lignes arrivent tout de suite
+            st.write_stream(stream_script(script_model, script_prompt(selected_prod, angle, context_perplexity)))
+    else:
+        n_scripts = len(selected_prods) * len(selected_angles)
+        if n_scripts > MAX_BATCH:
+            st.warning(f"{n_scripts} scripts demandés : maximum {MAX_BATCH} par série.")
+        elif st.button(f"Génère les {n_scripts} scripts ✨", disabled=n_scripts == 0):
+            with st.spinner(f"Rédaction de {n_scripts} scripts..."):
+                concurrency = st.secrets.get("gemini", {}).get("concurrency", CONCURRENCY)
+                st.session_state.script_batch = generate_batch(
+                    script_model, selected_prods, selected_angles, context_perplexity, concurrency
+                )
+
+        # Gardé en session : le clic sur "Télécharger" relance le script sans perdre la série
+        batch = st.session_state.get("script_batch")
+        if batch is not None:
+            failed = batch["erreur"].notna().sum()
+            st.caption(f"{len(batch) - failed} script(s) générés, {failed} échec(s)")
+            st.dataframe(batch, hide_index=True, use_container_width=True)
+            st.download_button(
+                "📥 Télécharger (CSV)", batch.to_csv(index=False).encode("utf-8-sig"),
+                file_name="scripts_sublime_haven.csv", mime="text/csv",
+            )
@@ -0,0 +1,210 @@
+from datetime import datetime
+
+import pandas as pd
+import pytz
+import streamlit as st
+
+from data import get_inventory, get_pending_web_orders, load_history, deliver_orders, cancel_orders
+from search import search_orders
+from perf import span
+from outbox import get_outbox
+
+# --- PAGE 1 : OPÉRATIONS MODIFIÉE ---
+st.header("Gestion Quotidienne")
+
+# 1. Barre de Recherche Globale
+search_query = st.text_input("🔍 Rechercher une commande (N° Tel, Ref commande, Nom produit)", placeholder="Ex: 5656 ou 0707...")
+
+# 2. Récupération des données (filtrées côté serveur)
+with span("Chargement commandes"):
+    if search_query:
+        # On cherche dans le téléphone, la ref, ou le nom du produit
+        pending_orders = search_orders(search_query) # En recherche, on montre tout ce qui matche
+        st.info(f"Résultats de recherche : {len(pending_orders)} commande(s) trouvée(s)")
+    else:
+        # Si pas de recherche, on affiche par défaut les "En attente"
+        pending_orders = get_pending_web_orders()
+
+# --- ONGLET 1 : À TRAITER ---
+# Calcul du nombre pour le badge
+count_pending = len(pending_orders)
+
+tab_web, tab_history, tab_manual, tab_expense = st.tabs([
+    f"⚡ À Traiter ({count_pending})", 
+    "📂 Historique / Terminées",
+    "🛒 Vente Manuelle", 
+    "💸 Dépenses"
+])
+
+# --- CONTENU ONGLET À TRAITER ---
+with tab_web, span("À Traiter"):
+    if pending_orders.empty:
+        st.success("🎉 Tout est à jour ! Aucune commande en attente.")
+    else:
+        # Affichage par pages : seules les commandes de la page courante sont dessinées
+        c_mode, c_size, c_page = st.columns([3, 1, 1])
+        view_mode = c_mode.radio("Affichage", ["🗂️ Cartes", "📋 Liste compacte"], horizontal=True, key="queue_mode")
+        page_size = c_size.selectbox("Par page", [10, 25, 50, 100], key="queue_size")
+        nb_pages = (count_pending - 1) // page_size + 1
+        # Page courante tenue uniquement par session_state (initialisée, puis ramenée dans les bornes
+        # si la file a raccourci) : pas de value= en plus, que Streamlit signalerait
+        st.session_state.queue_page = min(st.session_state.get("queue_page", 1), nb_pages)
+        page_num = c_page.number_input(f"Page (/{nb_pages})", min_value=1, max_value=nb_pages, key="queue_page")
+        page_orders = pending_orders.iloc[(page_num - 1) * page_size:page_num * page_size]
+
+        if view_mode == "📋 Liste compacte":
+            # Tableau avec cases à cocher + actions groupées
+            queue = pd.DataFrame({
+                "Choisir": False,
+                "Réf": page_orders['order_ref'].fillna("Sans Ref"),
+                "Client": page_orders['customer_phone'],
+                "Produit": page_orders['product_name'],
+                "Qté": page_orders['quantity_sold'],
+                "Stock": page_orders['stock_quantity'],
+                "Source": page_orders['marketing_source'],
+                "Date": page_orders['created_at'],
+                "Etat": page_orders['status'],
+            }, index=page_orders['id'])
+            edited = st.data_editor(
+                queue,
+                column_config={
+                    "Choisir": st.column_config.CheckboxColumn("✔", default=False),
+                    "Date": st.column_config.DatetimeColumn("Date", format="DD/MM HH:mm"),
+                },
+                disabled=[c for c in queue.columns if c != "Choisir"],
+                hide_index=True,
+                use_container_width=True,
+                key=f"queue_editor_{page_num}_{page_size}",
+            )
+            selected_ids = edited.index[edited["Choisir"]].tolist()
+
+            col_val, col_can, _ = st.columns([1, 1, 2])
+            if col_val.button(f"✅ LIVRÉ ({len(selected_ids)})", type="primary", disabled=not selected_ids):
+                results = deliver_orders(selected_ids)
+                failed = [f"{order_id} : {message}" for order_id, ok, message in results if not ok]
+                st.toast(f"{len(results) - len(failed)} commande(s) validée(s)")
+                if failed:
+                    st.session_state.queue_errors = failed
+                st.rerun()
+            if col_can.button(f"❌ ANNULER ({len(selected_ids)})", disabled=not selected_ids):
+                nb_cancelled = cancel_orders(selected_ids)
+                st.toast(f"{nb_cancelled} commande(s) annulée(s)")
+                st.rerun()
+
+            for error in st.session_state.pop("queue_errors", []):
+                st.error(error)
+        else:
+            for index, order in page_orders.iterrows():
+                # Carte visuelle
+                ref_display = f"#{order['order_ref']}" if order['order_ref'] else "Sans Ref"
+
+                with st.expander(f"{ref_display} | {order['customer_phone']} | {order['product_name']}", expanded=True):
+                    c1, c2, c3 = st.columns([2, 2, 3])
+
+                    prod_name = order['product_name']
+                    qty_sold = order['quantity_sold']
+                    current_stock = order['stock_quantity']
+
+                    with c1:
+                        st.write(f"**Produit:** {prod_name}")
+                        st.write(f"**Quantité:** {qty_sold}")
+                        if current_stock < qty_sold:
+                            st.error(f"Stock critique : {current_stock}")
+                        else:
+                            st.caption(f"Stock dispo : {current_stock}")
+
+                    with c2:
+                        st.write(f"**Client:** {order['customer_phone']}")
+                        st.write(f"**Source:** :blue[{order['marketing_source']}]")
+                        st.caption(f"Date: {order['created_at'].strftime('%d/%m %H:%M')}")
+
+                    with c3:
+                        col_val, col_can = st.columns(2)
+                        if col_val.button("✅ LIVRÉ", key=f"v_{order['id']}", type="primary"):
+                            [(order_id, ok, message)] = deliver_orders([order['id']])
+                            if ok:
+                                st.toast("Validé !")
+                                st.rerun()
+                            else:
+                                st.error(message)
+
+                        if col_can.button("❌ ANNULER", key=f"c_{order['id']}"):
+                            cancel_orders([order['id']])
+                            st.rerun()
+
+# --- CONTENU ONGLET HISTORIQUE ---
+with tab_history, span("Historique"):
+    st.write("Dernières commandes terminées")
+    # Pages de 100 lignes, chargées à la demande (pagination par clé)
+    completed_orders = load_history()
+    if completed_orders.empty:
+        st.info("Aucune commande terminée.")
+    else:
+        # On affiche un tableau propre pour l'historique
+        st.dataframe(
+            completed_orders[['created_at', 'order_ref', 'customer_phone', 'product_id', 'total_amount_cfa', 'status', 'marketing_source']],
+            column_config={
+                "created_at": st.column_config.DatetimeColumn("Date", format="D MMM, HH:mm"),
+                "order_ref": "Réf",
+                "customer_phone": "Client",
+                "product_id": "Code Produit",
+                "total_amount_cfa": st.column_config.NumberColumn("Montant", format="%d CFA"),
+                "status": "Etat",
+                "marketing_source": "Source"
+            },
+            use_container_width=True,
+            height=400
+        )
+        if not st.session_state.history_exhausted:
+            if st.button(f"Charger plus ({len(completed_orders)} affichées)"):
+                load_history(more=True)
+                st.rerun()
+
+# --- ONGLET 2 : VENTE MANUELLE (Ton ancien code) ---
+with tab_manual, span("Vente Manuelle"):
+    df_inv = get_inventory()
+    if not df_inv.empty:
+        active_products = df_inv[df_inv['quantity'] > 0]
+        product_options = {row['product_name']: row for index, row in active_products.iterrows()}
+
+        with st.form("sell_form"):
+            st.write("Saisir une vente faite par téléphone/WhatsApp (hors site)")
+            col1, col2 = st.columns(2)
+            with col1:
+                phone = st.text_input("Téléphone Client", placeholder="0707...")
+                product_name = st.selectbox("Produit", list(product_options.keys()))
+                source = st.selectbox("Source", ["Appel Direct", "Bouche à oreille", "Inconnu"])
+            with col2:
+                qty = st.number_input("Quantité", min_value=1, value=1)
+                selected_prod = product_options[product_name] if product_name else None
+                unit_price = selected_prod['sell_price_cfa'] if selected_prod is not None else 0
+                manual_price = st.number_input("Prix Total (CFA)", value=int(unit_price * qty))
+
+            submitted = st.form_submit_button("Enregistrer Vente Manuelle")
+
+            if submitted:
+                if not phone:
+                    st.error("Téléphone obligatoire.")
+                else:
+                    # Notée localement tout de suite, envoyée à process_sale en arrière-plan
+                    # (un refus, ex. stock insuffisant, apparaît dans la barre latérale)
+                    get_outbox().enqueue("sale", {
+                        "phone": phone, "product_id": selected_prod['id'],
+                        "qty": int(qty), "total": int(manual_price),
+                        "source": source
+                    })
+                    st.success("Vente enregistrée ! (envoi en arrière-plan)")
+
+# --- ONGLET 3 : DÉPENSES ---
+with tab_expense:
+    with st.form("expense_form"):
+        cat = st.selectbox("Catégorie", ["Transport", "Internet/Data", "Emballage", "Marketing", "Autre"])
+        montant = st.number_input("Montant (CFA)", min_value=0)
+        desc = st.text_input("Description")
+        if st.form_submit_button("Enregistrer Dépense"):
+            get_outbox().enqueue("expense", {
+                "type": "SORTIE", "category": cat,
+                "amount_cfa": montant, "description": desc,
+                "date": datetime.now(pytz.utc).isoformat()
+            })
+            st.success("Dépense notée.")
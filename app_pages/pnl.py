@@ -0,0 +1,121 @@
+import plotly.express as px
+import streamlit as st
+
+from data import fetch_parallel, get_inventory
+from daily_stats import utc_today
+from perf import span
+from pnl import profit_and_loss, month_start, add_months, months_between
+
+# --- PAGE 5 : RENTABILITÉ (COMPTE DE RÉSULTAT) ---
+st.title("Rentabilité 💰")
+
+# 0. PÉRIODE (au mois)
+today = utc_today()
+this_month = month_start(today)
+PERIODS = {
+    "12 derniers mois": (add_months(this_month, -11), this_month),
+    "Année en cours": (this_month.replace(month=1), this_month),
+    "Année précédente": (this_month.replace(year=this_month.year - 1, month=1), this_month.replace(year=this_month.year - 1, month=12)),
+}
+c_period, c_months = st.columns([1, 2])
+period = c_period.selectbox("Période", list(PERIODS) + ["Personnalisée"])
+if period == "Personnalisée":
+    choices = months_between(add_months(this_month, -35), this_month)
+    start, end = c_months.select_slider(
+        "Du / au", options=choices, value=(choices[-12], choices[-1]), format_func=lambda m: m.strftime("%m/%Y"),
+    )
+else:
+    start, end = PERIODS[period]
+    c_months.caption(f"De {start:%m/%Y} à {end:%m/%Y}")
+
+def money(label):
+    return st.column_config.NumberColumn(label, format="%d CFA")
+
+# 1. CHARGEMENT (agrégats mensuels + noms des produits)
+with span("Chargement"):
+    loaded = fetch_parallel(pnl=lambda: profit_and_loss(start, end), inventory=get_inventory)
+pnl, df_inv = loaded["pnl"], loaded["inventory"]
+monthly = pnl["mois"]
+
+# --- SECTION 1 : RÉSULTAT DE LA PÉRIODE ---
+with span("KPIs"):
+    ca = int(monthly["ca"].sum())
+    marge = int(monthly["marge_brute"].sum())
+    depenses = int(monthly["depenses"].sum())
+    net = marge - depenses
+
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("CA Livré", f"{ca:,.0f} CFA")
+    k2.metric("Marge Brute", f"{marge:,.0f} CFA", delta=f"{marge / ca * 100:.1f} % du CA" if ca else None)
+    k3.metric("Dépenses", f"{depenses:,.0f} CFA")
+    k4.metric("Résultat Net", f"{net:,.0f} CFA", delta=f"{net / ca * 100:.1f} % du CA" if ca else None)
+
+    missing = int(monthly["unites_sans_cout"].sum())
+    if missing:
+        st.warning(f"{missing} unité(s) livrée(s) sans coût d'achat enregistré : leur marge est surestimée.")
+
+# --- SECTION 2 : MOIS PAR MOIS ---
+with span("Évolution"):
+    series = monthly.reset_index()
+    series["mois"] = series["mois"].astype(str).str[:7]
+    fig = px.bar(
+        series.melt(id_vars="mois", value_vars=["ca", "marge_brute", "depenses"], var_name="poste", value_name="CFA"),
+        x="mois", y="CFA", color="poste", barmode="group", title="CA, marge brute et dépenses par mois",
+        labels={"poste": ""},
+    )
+    fig.add_scatter(x=series["mois"], y=series["resultat_net"], mode="lines+markers", name="resultat_net")
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(
+        series[["mois", "commandes", "ca", "cout_achat", "marge_brute", "taux_marge", "depenses", "resultat_net"]],
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "mois": "Mois",
+            "commandes": "Commandes",
+            "ca": money("CA"),
+            "cout_achat": money("Coût d'achat"),
+            "marge_brute": money("Marge brute"),
+            "taux_marge": st.column_config.NumberColumn("Taux de marge", format="%.1f %%"),
+            "depenses": money("Dépenses"),
+            "resultat_net": money("Résultat net"),
+        },
+    )
+    st.download_button("📥 Compte de résultat (CSV)", monthly.to_csv().encode("utf-8-sig"),
+                       file_name=f"resultat_{start:%Y%m}_{end:%Y%m}.csv", mime="text/csv")
+
+st.divider()
+
+# --- SECTION 3 : D'OÙ VIENT LA MARGE, OÙ PART L'ARGENT ---
+margin_columns = {
+    "commandes": "Commandes",
+    "unites": "Unités",
+    "ca": money("CA"),
+    "cout_achat": money("Coût d'achat"),
+    "marge_brute": money("Marge brute"),
+    "taux_marge": st.column_config.NumberColumn("Taux de marge", format="%.1f %%"),
+}
+t_products, t_sources, t_expenses = st.tabs(["🧴 Par produit", "📣 Par source", "💸 Dépenses"])
+
+with t_products, span("Par produit"):
+    products = pnl["produits"].drop(columns="unites_sans_cout")
+    names = df_inv.set_index("id")["product_name"] if not df_inv.empty else {}
+    products.insert(0, "nom", products.index.map(lambda pid: names.get(pid, pid)))
+    st.dataframe(products, use_container_width=True, column_config={"produit": "Code", "nom": "Produit", **margin_columns})
+
+with t_sources, span("Par source"):
+    sources = pnl["sources"].drop(columns="unites_sans_cout")
+    if not sources.empty:
+        st.plotly_chart(px.bar(sources.reset_index(), x="source", y="marge_brute", color="taux_marge",
+                               title="Marge brute par source (CFA)"), use_container_width=True)
+    st.dataframe(sources, use_container_width=True, column_config={"source": "Source", **margin_columns})
+
+with t_expenses, span("Dépenses"):
+    by_category = pnl["depenses"]
+    if by_category.empty or by_category.columns.empty:
+        st.info("Aucune dépense enregistrée sur la période.")
+    else:
+        totals = by_category.sum().sort_values(ascending=False).rename("CFA").reset_index()
+        st.plotly_chart(px.pie(totals, values="CFA", names="catégorie", title="Dépenses par catégorie", hole=0.4),
+                        use_container_width=True)
+        st.dataframe(by_category.set_axis(by_category.index.astype(str).str[:7]), use_container_width=True)
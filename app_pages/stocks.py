@@ -0,0 +1,328 @@
+import io
+from datetime import datetime, time, timezone
+
+import streamlit as st
+
+from data import init_connection, invalidate, table_generation, get_inventory, get_stock_movements, get_stock_at,\
+    MOVEMENTS_PAGE_SIZE
+from perf import span
+from catalog import read_rows, plan_import, apply_import, export_csv, export_xlsx
+from replenishment import replenishment_plan, LEAD_TIME, SERVICE_LEVELS, WINDOWS
+
+supabase = init_connection()
+
+# --- PAGE 2 : STOCKS & GESTION ---
+st.header("Gestion de l'Inventaire")
+
+# 1. Récupération des données fraîches
+df = get_inventory()
+
+# --- TABLEAU DE BORD VISUEL ---
+with span("Tableau stock"):
+    if not df.empty:
+        # On affiche d'abord le tableau pour avoir une vue d'ensemble
+        st.dataframe(
+            df, 
+            use_container_width=True,
+            column_config={
+                "id": "Code (SKU)",
+                "product_name": "Produit",
+                "quantity": "Stock",
+                "buy_price_cfa": st.column_config.NumberColumn("Prix Achat", format="%d CFA"),
+                "sell_price_cfa": st.column_config.NumberColumn("Prix Vente", format="%d CFA"),
+            }
+        )
+    else:
+        st.info("Votre inventaire est vide.")
+
+st.divider()
+
+# --- ZONE D'ACTION ---
+st.subheader("Action sur le stock")
+
+# Choix du mode de travail
+mode = st.radio("Que voulez-vous faire ?", ["✏️ Modifier / Supprimer un produit", "➕ Créer un nouveau produit", "📥 Import / Export en masse", "🕓 Mouvements & stock à date", "🚚 À réapprovisionner"], horizontal=True)
+
+# --- MODE 1 : MODIFIER / SUPPRIMER ---
+if mode == "✏️ Modifier / Supprimer un produit":
+    if df.empty:
+        st.warning("Rien à modifier.")
+    else:
+        # Liste déroulante intelligente : "Code - Nom du produit"
+        product_list = [f"{row['id']} - {row['product_name']}" for index, row in df.iterrows()]
+        selected_product_str = st.selectbox("Sélectionnez le produit à gérer", product_list)
+
+        # On extrait l'ID (la partie avant le tiret)
+        selected_id = selected_product_str.split(" - ")[0]
+
+        # On récupère les infos actuelles de ce produit pour pré-remplir le formulaire
+        current_data = df[df['id'] == selected_id].iloc[0]
+
+        with st.form("edit_form"):
+            st.caption(f"Modification de : **{current_data['product_name']}** (Code: {selected_id})")
+
+            # Champs modifiables
+            new_name = st.text_input("Nom du Produit", value=current_data['product_name'])
+
+            c1, c2, c3 = st.columns(3)
+            new_qty = c1.number_input("Stock Actuel", value=int(current_data['quantity']), step=1)
+            new_buy = c2.number_input("Prix Achat (Coût)", value=int(current_data['buy_price_cfa']), step=500)
+            new_sell = c3.number_input("Prix Vente (Client)", value=int(current_data['sell_price_cfa']), step=500)
+
+            col_save, col_del = st.columns([1, 1])
+
+            # BOUTON SAUVEGARDER
+            if col_save.form_submit_button("💾 Enregistrer les changements", type="primary"):
+                try:
+                    supabase.table("inventory").update({
+                        "product_name": new_name,
+                        "quantity": new_qty,
+                        "buy_price_cfa": new_buy,
+                        "sell_price_cfa": new_sell
+                    }).eq("id", selected_id).execute()
+                    st.success(f"Produit {selected_id} mis à jour!")
+                    invalidate("inventory") # Force le rechargement
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Erreur : {e}")
+
+            # BOUTON SUPPRIMER
+            if col_del.form_submit_button("🗑️ SUPPRIMER DÉFINITIVEMENT", type="secondary"):
+                try:
+                    supabase.table("inventory").delete().eq("id", selected_id).execute()
+                    st.warning(f"Produit {selected_id} supprimé.")
+                    invalidate("inventory")
+                    st.rerun()
+                except Exception as e:
+                    # Message d'erreur spécifique si le produit a déjà été vendu
+                    st.error("Impossible de supprimer ce produit car il apparaît dans l'historique des ventes (Commandes).")
+                    st.info("💡 Conseil : Au lieu de le supprimer, mettez son stock à 0 et ajoutez '(OBSOLÈTE)' à son nom.")
+
+# --- MODE 2 : CRÉER NOUVEAU ---
+elif mode == "➕ Créer un nouveau produit":
+    with st.form("add_form"):
+        st.write("Ajout d'une nouvelle référence au catalogue")
+
+        c_code, c_name = st.columns([1, 3])
+        new_id = c_code.text_input("Code (Ex: PR015)", placeholder="PR...")
+        new_name = c_name.text_input("Nom du produit", placeholder="Ex: Nouveau Savon")
+
+        c1, c2, c3 = st.columns(3)
+        new_qty = c1.number_input("Stock de départ", min_value=0, value=0)
+        new_buy = c2.number_input("Prix Achat", min_value=0, value=0)
+        new_sell = c3.number_input("Prix Vente", min_value=0, value=0)
+
+        if st.form_submit_button("Créer le produit"):
+            if new_id and new_name:
+                try:
+                    # Vérifier si l'ID existe déjà
+                    existing = supabase.table("inventory").select("id").eq("id", new_id).execute()
+                    if existing.data:
+                        st.error(f"Erreur : Le code '{new_id}' existe déjà !")
+                    else:
+                        supabase.table("inventory").insert({
+                            "id": new_id,
+                            "product_name": new_name,
+                            "quantity": new_qty,
+                            "buy_price_cfa": new_buy,
+                            "sell_price_cfa": new_sell
+                        }).execute()
+                        st.success(f"Produit {new_name} créé avec succès !")
+                        invalidate("inventory")
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"Erreur : {e}")
+            else:
+                st.warning("Le Code et le Nom sont obligatoires.")
+
+# --- MODE 3 : IMPORT / EXPORT EN MASSE ---
+elif mode == "📥 Import / Export en masse":
+    st.write("Exporter le catalogue")
+    c_csv, c_xlsx, _ = st.columns([1, 1, 2])
+    # Le fichier n'est construit qu'au clic (page par page), pas à chaque affichage
+    c_csv.download_button("📄 CSV", export_csv, file_name="inventaire.csv", mime="text/csv")
+    c_xlsx.download_button(
+        "📊 Excel", export_xlsx, file_name="inventaire.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+    st.write("Importer un fichier (CSV ou Excel)")
+    st.caption("Colonnes : id (ou code / sku), product_name, quantity, buy_price_cfa, sell_price_cfa. "
+               "Seul le code est obligatoire pour un produit existant : les colonnes absentes ou vides ne changent pas.")
+    uploaded = st.file_uploader("Fichier catalogue", type=["csv", "xlsx"], label_visibility="collapsed")
+    add_quantity = st.checkbox("Réassort : les quantités du fichier s'ajoutent au stock actuel")
+
+    if uploaded is not None:
+        # Analyse gardée en session : refaite seulement si le fichier, l'option ou l'inventaire change
+        plan_key = (uploaded.file_id, add_quantity, table_generation("inventory"))
+        if st.session_state.get("import_plan_key") != plan_key:
+            try:
+                with span("Analyse import"):
+                    rows = read_rows(io.BytesIO(uploaded.getvalue()), uploaded.name)
+                    st.session_state.import_plan = plan_import(rows, df, add_quantity)
+                st.session_state.import_plan_key = plan_key
+            except ValueError as e:
+                st.error(f"Fichier illisible : {e}")
+                st.stop()
+        changes, errors = st.session_state.import_plan
+
+        counts = changes["action"].value_counts()
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Nouveaux", int(counts.get("nouveau", 0)))
+        m2.metric("Modifiés", int(counts.get("modifié", 0)))
+        m3.metric("Inchangés", int(counts.get("inchangé", 0)))
+        m4.metric("Lignes en erreur", errors["ligne"].nunique())
+
+        to_write = changes[changes["action"] != "inchangé"]
+        if not to_write.empty:
+            st.dataframe(to_write if add_quantity else to_write.drop(columns="ajout"), hide_index=True,
+                         use_container_width=True, height=300)
+        if not errors.empty:
+            with st.expander(f"⚠️ {len(errors)} erreur(s) : ces lignes ne seront pas importées"):
+                st.dataframe(errors, hide_index=True, use_container_width=True)
+                st.download_button("📥 Rapport d'erreurs (CSV)", errors.to_csv(index=False).encode("utf-8-sig"),
+                                   file_name="erreurs_import.csv", mime="text/csv")
+
+        if st.button(f"✅ Appliquer {len(to_write)} changement(s)", type="primary", disabled=to_write.empty):
+            # Analyse refaite sur un inventaire relu juste avant l'écriture
+            invalidate("inventory")
+            changes, errors = plan_import(read_rows(io.BytesIO(uploaded.getvalue()), uploaded.name), get_inventory(), add_quantity)
+            bar = st.progress(0.0)
+            with span("Écriture import"):
+                written, failed = apply_import(
+                    changes, add_quantity, note=f"Import {uploaded.name}",
+                    progress=lambda done, total: bar.progress(done / total, f"{done}/{total}"),
+                )
+            st.session_state.pop("import_plan_key", None)
+            st.success(f"{written} produit(s) enregistré(s).")
+            if not failed.empty:
+                st.error(f"{failed['ligne'].nunique()} ligne(s) refusée(s) par la base.")
+                st.dataframe(failed, hide_index=True, use_container_width=True)
+
+# --- MODE 4 : JOURNAL DU STOCK ---
+elif mode == "🕓 Mouvements & stock à date":
+    KIND_LABELS = {
+        "creation": "🆕 Création", "vente": "🛒 Vente", "annulation": "↩️ Annulation", "ajustement": "✏️ Ajustement",
+        "reassort": "📦 Réassort", "suppression": "🗑️ Suppression",
+    }
+    tab_product, tab_date = st.tabs(["Mouvements par produit", "Stock à une date"])
+
+    with tab_product:
+        if df.empty:
+            st.info("Votre inventaire est vide.")
+        else:
+            product_list = [f"{row['id']} - {row['product_name']}" for index, row in df.iterrows()]
+            selected_id = st.selectbox("Produit", product_list, key="ledger_product").split(" - ")[0]
+            with span("Journal du stock"):
+                moves = get_stock_movements(selected_id)
+
+            if moves.empty:
+                st.info("Aucun mouvement enregistré pour ce produit.")
+            else:
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Entrées", int(moves.loc[moves['delta'] > 0, 'delta'].sum()))
+                m2.metric("Sorties", int(-moves.loc[moves['delta'] < 0, 'delta'].sum()))
+                m3.metric("Dernier mouvement", moves['created_at'].iloc[0].strftime('%d/%m/%Y %H:%M'))
+
+                import plotly.express as px
+                fig = px.line(moves.iloc[::-1], x='created_at', y='quantity_after', line_shape='hv',
+                              labels={'created_at': 'Date', 'quantity_after': 'Stock'}, title="Évolution du stock")
+                st.plotly_chart(fig, use_container_width=True)
+
+                st.dataframe(
+                    moves.assign(kind=moves['kind'].astype(str).map(KIND_LABELS))
+                        [['created_at', 'kind', 'delta', 'quantity_after', 'order_id', 'unit_buy_cost', 'note']],
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        "created_at": st.column_config.DatetimeColumn("Date", format="DD/MM/YYYY HH:mm"),
+                        "kind": "Type",
+                        "delta": st.column_config.NumberColumn("Mouvement", format="%+d"),
+                        "quantity_after": "Stock après",
+                        "order_id": st.column_config.NumberColumn("Commande", format="%d"),
+                        "unit_buy_cost": st.column_config.NumberColumn("Coût unitaire", format="%d CFA"),
+                        "note": "Note",
+                    },
+                )
+                if len(moves) == MOVEMENTS_PAGE_SIZE:
+                    st.caption(f"{MOVEMENTS_PAGE_SIZE} derniers mouvements affichés.")
+
+    with tab_date:
+        c_day, c_time = st.columns(2)
+        day = c_day.date_input("Date", value=datetime.now(timezone.utc).date(), format="DD/MM/YYYY")
+        hour = c_time.time_input("Heure (UTC)", value=time(23, 59))
+        at = datetime.combine(day, hour, tzinfo=timezone.utc)
+        with span("Stock à date"):
+            stock = get_stock_at(at.isoformat())
+
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Valeur du stock (prix d'achat)", f"{int(stock['valeur'].sum()):,} CFA".replace(",", " "))
+        m2.metric("Unités en stock", int(stock['quantity'].sum()))
+        m3.metric("Produits en stock", int((stock['quantity'] > 0).sum()))
+
+        if not stock.empty:
+            names = df.set_index('id')['product_name'] if not df.empty else {}
+            stock = stock.assign(product_name=stock['product_id'].map(names).fillna("(supprimé)"))\
+                .sort_values('valeur', ascending=False)
+            st.dataframe(
+                stock[['product_id', 'product_name', 'quantity', 'buy_price_cfa', 'valeur']],
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "product_id": "Code (SKU)",
+                    "product_name": "Produit",
+                    "quantity": "Stock",
+                    "buy_price_cfa": st.column_config.NumberColumn("Prix Achat", format="%d CFA"),
+                    "valeur": st.column_config.NumberColumn("Valeur", format="%d CFA"),
+                },
+            )
+            st.download_button("📥 Télécharger (CSV)", stock.to_csv(index=False).encode("utf-8-sig"),
+                               file_name=f"stock_{at:%Y%m%d_%H%M}.csv", mime="text/csv")
+
+# --- MODE 5 : RÉAPPROVISIONNEMENT ---
+elif mode == "🚚 À réapprovisionner":
+    c_lead, c_service, c_all = st.columns(3)
+    lead_time = c_lead.number_input("Délai fournisseur (jours)", min_value=1, max_value=90, value=LEAD_TIME)
+    service_level = c_service.selectbox("Taux de service visé", list(SERVICE_LEVELS), index=1,
+                                        help="Part des réassorts qui arrivent avant la rupture")
+    show_all = c_all.toggle("Afficher tous les produits", value=False)
+
+    with span("Réapprovisionnement"):
+        plan = replenishment_plan(lead_time, service_level)
+
+    if plan.empty:
+        st.info("Votre inventaire est vide.")
+    else:
+        urgent = plan[plan['statut'].isin(["Rupture", "À commander"])]
+        r1, r2, r3 = st.columns(3)
+        r1.metric("En rupture", int((plan['statut'] == "Rupture").sum()))
+        r2.metric("À commander", int((plan['statut'] == "À commander").sum()))
+        r3.metric("Unités à commander", int(urgent['a_commander'].sum()))
+
+        shown = plan if show_all else urgent
+        if shown.empty:
+            st.success("Aucun produit sous son point de commande.")
+        else:
+            st.dataframe(
+                shown[['statut', 'id', 'product_name', 'quantity', *[f"vente_{w}j" for w in WINDOWS], 'prevision',
+                       'jours_couverture', 'rupture_le', 'stock_securite', 'point_commande', 'a_commander']],
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "statut": "Statut",
+                    "id": "Code (SKU)",
+                    "product_name": "Produit",
+                    "quantity": "Stock",
+                    **{f"vente_{w}j": st.column_config.NumberColumn(f"Ventes/j ({w} j)", format="%.2f") for w in WINDOWS},
+                    "prevision": st.column_config.NumberColumn("Prévision/j", format="%.2f",
+                                                               help="Lissage exponentiel de la demande journalière"),
+                    "jours_couverture": st.column_config.NumberColumn("Couverture (j)", format="%.1f"),
+                    "rupture_le": st.column_config.DateColumn("Rupture prévue", format="DD/MM/YYYY"),
+                    "stock_securite": "Stock de sécurité",
+                    "point_commande": "Point de commande",
+                    "a_commander": "À commander",
+                },
+            )
+            st.download_button("📥 Liste de réassort (CSV)", shown.to_csv(index=False).encode("utf-8-sig"),
+                               file_name="reassort.csv", mime="text/csv")
+        st.caption("Prévision recalculée chaque jour sur les 12 derniers mois de commandes (hors annulations client).")
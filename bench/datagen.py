@@ -0,0 +1,169 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+# --- DONNÉES SYNTHÉTIQUES ---
+# Inventaire, commandes et trafic au format des tables Supabase, reproductibles (graine fixe).
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+EXPENSE_CATEGORIES = ["Transport", "Internet/Data", "Emballage", "Marketing", "Autre"]
+STATUSES = ["Livré"] * 6 + ["Annulé (Client)", "Annulé (Stock)", "En attente Web", "En attente Web", "Nouveau"]
+SOURCES = ["TikTok", "Facebook", "Instagram", "WhatsApp", "Appel Direct", "Bouche à oreille", "Inconnu"]
+DEVICES = ["mobile", "mobile", "mobile", "desktop", "tablet"]
+OSES = ["Android", "Android", "iOS", "Windows", "MacOS", "Linux"]
+# Les données s'arrêtent à minuit (UTC) aujourd'hui : les périodes "N derniers jours" de la page Analytics
+# tombent sur des données, et les tirages restent identiques d'un lancement à l'autre le même jour
+NOW = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def parse_size(label):
+    return SIZES.get(label.lower()) or int(label)
+
+
+def _timestamps(rnd, n, days):
+    # Tirées sur la période puis triées : les ids suivent l'ordre de création, comme en base
+    seconds = sorted(rnd.randrange(days * 86400) for _ in range(n))
+    start = NOW - timedelta(days=days)
+    return [(start + timedelta(seconds=s)).isoformat() for s in seconds]
+
+
+def make_inventory(n_products, seed=42):
+    rnd = random.Random(seed)
+    inventory = []
+    for i in range(n_products):
+        buy = rnd.randint(2, 20) * 500
+        inventory.append({
+            "id": f"PR{i:04d}",
+            "product_name": f"Produit {i} {rnd.choice(['Savon', 'Crème', 'Huile', 'Sérum', 'Lait'])}",
+            "quantity": rnd.randint(0, 300),
+            "buy_price_cfa": buy,
+            "sell_price_cfa": buy + rnd.randint(1, 10) * 500,
+        })
+    return inventory
+
+
+def make_orders(n_orders, inventory, days=365, seed=43):
+    rnd = random.Random(seed)
+    # Quelques best-sellers : la demande suit grossièrement une loi de puissance
+    weights = [1 / (i + 1) for i in range(len(inventory))]
+    products = rnd.choices(inventory, weights=weights, k=n_orders)
+    orders = []
+    for i, (created_at, product) in enumerate(zip(_timestamps(rnd, n_orders, days), products)):
+        qty = rnd.choice([1, 1, 1, 2, 2, 3])
+        status = rnd.choice(STATUSES)
+        orders.append({
+            "id": i + 1,
+            "created_at": created_at,
+            "order_ref": str(10000 + i) if rnd.random() < 0.9 else None,
+            "customer_phone": rnd.choice(["07", "05", "01", "+225 07"]) + f"{rnd.randrange(10**8):08d}",
+            "product_id": product["id"],
+            "quantity_sold": qty,
+            "total_amount_cfa": qty * product["sell_price_cfa"],
+            "status": status,
+            "marketing_source": rnd.choice(SOURCES),
+            "unit_buy_cost_at_sale": product["buy_price_cfa"] if status == "Livré" else None,
+        })
+    return orders
+
+
+def make_traffic(n_visits, days=365, seed=44):
+    rnd = random.Random(seed)
+    return [
+        {"id": i + 1, "created_at": created_at, "source": rnd.choice(SOURCES),
+         "device_type": rnd.choice(DEVICES), "os": rnd.choice(OSES)}
+        for i, created_at in enumerate(_timestamps(rnd, n_visits, days))
+    ]
+
+
+def make_cashflow(n_entries, days=365, seed=45):
+    # Dépenses saisies dans l'onglet "💸 Dépenses"
+    rnd = random.Random(seed)
+    return [
+        {"id": i + 1, "created_at": created_at, "date": created_at, "type": "SORTIE",
+         "category": rnd.choice(EXPENSE_CATEGORIES), "amount_cfa": rnd.randint(1, 60) * 500, "description": ""}
+        for i, created_at in enumerate(_timestamps(rnd, n_entries, days))
+    ]
+
+
+def make_pnl_rollups(orders, cashflow):
+    # Reprise de l'historique, comme la fin de sql/pnl_rollups.sql
+    from bench.fake_supabase import pnl_sales_row, pnl_expenses_row
+
+    def rollup(rows, to_row):
+        totals = {}
+        for row in rows:
+            keys, values = to_row(row)
+            target = totals.setdefault(tuple(keys.items()), dict.fromkeys(values, 0))
+            for name, value in values.items():
+                target[name] += value
+        return [{**dict(keys), **values} for keys, values in totals.items()]
+
+    return (
+        rollup([o for o in orders if o["status"] == "Livré"], pnl_sales_row),
+        rollup([c for c in cashflow if c["type"] == "SORTIE"], pnl_expenses_row),
+    )
+
+
+def make_stock_ledger(inventory, orders, days=365):
+    # Journal cohérent avec l'inventaire final : une création au début de la période, une vente par
+    # commande livrée, et une photo du stock chaque lundi (comme take_stock_snapshot après 90 jours)
+    delivered = [o for o in orders if o["status"] == "Livré"]
+    sold = {}
+    for order in delivered:
+        sold[order["product_id"]] = sold.get(order["product_id"], 0) + order["quantity_sold"]
+    start = NOW - timedelta(days=days)
+    stock, buy, movements = {}, {}, []
+    for product in inventory:
+        stock[product["id"]] = product["quantity"] + sold.get(product["id"], 0)
+        buy[product["id"]] = product["buy_price_cfa"]
+        movements.append({
+            "product_id": product["id"], "created_at": start.isoformat(), "delta": stock[product["id"]],
+            "quantity_after": stock[product["id"]], "kind": "creation", "order_id": None,
+            "unit_buy_cost": product["buy_price_cfa"], "note": None,
+        })
+
+    snapshots = []
+    monday = start + timedelta(days=(7 - start.weekday()) % 7 or 7)
+    for order in delivered:
+        while monday.isoformat() <= order["created_at"]:
+            snapshots.extend(
+                {"day": monday.date().isoformat(), "product_id": pid, "quantity": q, "buy_price_cfa": buy[pid]}
+                for pid, q in stock.items()
+            )
+            monday += timedelta(days=7)
+        stock[order["product_id"]] -= order["quantity_sold"]
+        movements.append({
+            "product_id": order["product_id"], "created_at": order["created_at"], "delta": -order["quantity_sold"],
+            "quantity_after": stock[order["product_id"]], "kind": "vente", "order_id": order["id"],
+            "unit_buy_cost": order["unit_buy_cost_at_sale"], "note": None,
+        })
+    for i, movement in enumerate(movements):
+        movement["id"] = i + 1
+    return movements, snapshots
+
+
+def _with_updated_at(rows, default=None):
+    # updated_at (filigrane de la réplique locale) : la date de création pour des lignes jamais modifiées
+    for row in rows:
+        row.setdefault("created_at", default)
+        row["updated_at"] = row["created_at"]
+    return rows
+
+
+def generate(n_rows, days=365):
+    # n_rows commandes et n_rows visites ; le catalogue grandit moins vite (20 à 5000 SKU)
+    inventory = make_inventory(max(20, min(5000, n_rows // 200)))
+    orders = make_orders(n_rows, inventory, days)
+    movements, snapshots = make_stock_ledger(inventory, orders, days)
+    cashflow = make_cashflow(max(50, n_rows // 50), days)
+    sales_monthly, expenses_monthly = make_pnl_rollups(orders, cashflow)
+    return {
+        "inventory": _with_updated_at(inventory, (NOW - timedelta(days=days)).isoformat()),
+        "orders": _with_updated_at(orders),
+        "site_traffic": make_traffic(n_rows, days),
+        "cashflow": _with_updated_at(cashflow),
+        "stock_movements": movements,
+        "stock_snapshots": snapshots,
+        "pnl_sales_monthly": sales_monthly,
+        "pnl_expenses_monthly": expenses_monthly,
+    }
@@ -0,0 +1,665 @@
+import contextlib
+import copy
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime, timezone
+
+# --- FAUX SUPABASE EN MÉMOIRE ---
+# Reproduit le sous-ensemble du client supabase-py utilisé par l'application :
+# table().select/insert/update/upsert/delete, les filtres (eq, neq, gt, lt, in_, not_, or_, ilike...),
+# order/limit/range, les embeddings "inventory(...)", les RPC (process_sale, deliver_orders...)
+# et le trigger du journal de stock (sql/stock_ledger.sql).
+# Sert aux benchmarks (bench/run.py) : aucune clé Supabase ni réseau nécessaire.
+
+# Tables à updated_at tenu par trigger + suppressions notées dans replica_deletions (sql/replica_sync.sql)
+WATERMARKED = {"orders", "inventory", "cashflow"}
+
+# Clés étrangères utilisées par les embeddings PostgREST "table(colonnes)"
+FOREIGN_KEYS = {
+    ("orders", "inventory"): ("product_id", "id"),
+}
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_top(text, sep=","):
+    parts, depth, buf = [], 0, ""
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append(buf.strip())
+            buf = ""
+        else:
+            buf += ch
+    if buf.strip():
+        parts.append(buf.strip())
+    return parts
+
+
+def _coerce(value, sample):
+    # Les filtres PostgREST arrivent en texte : on les ramène au type de la colonne
+    if isinstance(sample, bool):
+        return str(value).lower() == "true"
+    if isinstance(sample, int) and not isinstance(value, int):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    if isinstance(sample, float) and not isinstance(value, float):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _like(pattern, value, flags=0):
+    regex = "^" + re.escape(pattern).replace(r"\*", ".*").replace("%", ".*") + "$"
+    return re.match(regex, "" if value is None else str(value), flags) is not None
+
+
+def _compare(op, left, right):
+    if op in ("in", "is"):
+        pass
+    elif left is None:
+        return op == "neq"
+    else:
+        right = _coerce(right, left)
+    if op == "eq":
+        return left == right
+    if op == "neq":
+        return left != right
+    if op == "gt":
+        return left > right
+    if op == "gte":
+        return left >= right
+    if op == "lt":
+        return left < right
+    if op == "lte":
+        return left <= right
+    if op == "in":
+        values = [_coerce(v, left) for v in right] if left is not None else right
+        return left in values
+    if op == "is":
+        return left is None if right in (None, "null") else left == right
+    if op == "like":
+        return _like(right, left)
+    if op == "ilike":
+        return _like(right, left, re.IGNORECASE)
+    raise NotImplementedError(op)
+
+
+def _parse_or(expr):
+    # "a.eq.1,and(b.lt.2,c.gt.3)" -> prédicat
+    preds = []
+    for part in _split_top(expr):
+        if part.startswith("and(") or part.startswith("or("):
+            kind, inner = part.split("(", 1)
+            sub = [_parse_or(p) for p in _split_top(inner[:-1])]
+            if kind == "and":
+                preds.append(lambda row, sub=sub: all(p(row) for p in sub))
+            else:
+                preds.append(lambda row, sub=sub: any(p(row) for p in sub))
+        else:
+            col, op, value = part.split(".", 2)
+            value = value.strip('"')
+            if op == "in":
+                value = [v.strip().strip('"') for v in value.strip("()").split(",") if v.strip()]
+            preds.append(lambda row, c=col, o=op, v=value: _compare(o, row.get(c), v))
+    return lambda row: any(p(row) for p in preds)
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.limit_n = None
+        self.offset_n = 0
+        self.count = None
+        self.on_conflict = "id"
+        self.ignore_duplicates = False
+        self.negate_next = False
+
+    # --- Actions ---
+    def select(self, *columns, count=None, head=None):
+        self.columns = ",".join(columns) if columns else "*"
+        self.count = count
+        return self
+
+    def insert(self, json, **kwargs):
+        self.action, self.payload = "insert", json
+        return self
+
+    def upsert(self, json, on_conflict="id", ignore_duplicates=False, **kwargs):
+        self.action, self.payload = "upsert", json
+        self.on_conflict = on_conflict or "id"
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json, **kwargs):
+        self.action, self.payload = "update", json
+        return self
+
+    def delete(self, **kwargs):
+        self.action = "delete"
+        return self
+
+    # --- Filtres ---
+    @property
+    def not_(self):
+        self.negate_next = True
+        return self
+
+    def _filter(self, op, column, value):
+        negate, self.negate_next = self.negate_next, False
+        self.filters.append(lambda row: _compare(op, row.get(column), value) != negate)
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        # Comparaison sur le texte (comme l'URL PostgREST) avec un set : une liste de 200 ids
+        # sur 100k lignes ne doit pas coûter 20M comparaisons
+        negate, self.negate_next = self.negate_next, False
+        texts = {str(v) for v in values}
+        self.filters.append(lambda row: (row.get(column) is not None and str(row.get(column)) in texts) != negate)
+        return self
+
+    def is_(self, column, value):
+        return self._filter("is", column, value)
+
+    def like(self, column, pattern):
+        return self._filter("like", column, pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter("ilike", column, pattern)
+
+    def or_(self, filters, reference_table=None):
+        self.filters.append(_parse_or(filters))
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self.limit_n = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self.offset_n, self.limit_n = start, end - start + 1
+        return self
+
+    # --- Exécution ---
+    def _rows(self):
+        return self.client.tables.setdefault(self.table, [])
+
+    def _matching(self):
+        return [r for r in self._rows() if all(f(r) for f in self.filters)]
+
+    def _project(self, row):
+        out = {}
+        for part in _split_top(self.columns):
+            if part == "*":
+                out.update(row)
+            elif "(" in part:
+                name, inner = part.split("(", 1)
+                name = name.split("!")[0].strip()
+                local, remote = FOREIGN_KEYS[(self.table, name)]
+                target = self.client.index(name, remote).get(row.get(local))
+                cols = [c.strip() for c in inner[:-1].split(",")]
+                out[name] = None if target is None else (
+                    dict(target) if cols == ["*"] else {c: target.get(c) for c in cols}
+                )
+            else:
+                out[part] = row.get(part)
+        return out
+
+    def execute(self):
+        with self.client.call():
+            return self._execute()
+
+    def _execute(self):
+        rows = self._rows()
+        if self.action == "insert":
+            new = self.payload if isinstance(self.payload, list) else [self.payload]
+            new = [self.client.fill_defaults(self.table, r) for r in new]
+            rows.extend(new)
+            for row in new:
+                self.client.trigger(self.table, None, row)
+            self.client.touch(self.table)
+            return FakeResponse(copy.deepcopy(new))
+        if self.action == "upsert":
+            new = self.payload if isinstance(self.payload, list) else [self.payload]
+            keys = self.on_conflict.split(",")
+            existing = {tuple(r.get(k) for k in keys): r for r in rows}
+            out = []
+            for item in new:
+                key = tuple(item.get(k) for k in keys)
+                if key in existing:
+                    if not self.ignore_duplicates:
+                        old = dict(existing[key])
+                        existing[key].update(item)
+                        self.client.trigger(self.table, old, existing[key])
+                        out.append(existing[key])
+                else:
+                    row = self.client.fill_defaults(self.table, item)
+                    rows.append(row)
+                    existing[key] = row
+                    self.client.trigger(self.table, None, row)
+                    out.append(row)
+            self.client.touch(self.table)
+            return FakeResponse(copy.deepcopy(out))
+        matched = self._matching()
+        if self.action == "update":
+            for r in matched:
+                old = dict(r)
+                r.update(self.payload)
+                self.client.trigger(self.table, old, r)
+            self.client.touch(self.table)
+            return FakeResponse(copy.deepcopy(matched))
+        if self.action == "delete":
+            ids = {id(r) for r in matched}
+            rows[:] = [r for r in rows if id(r) not in ids]
+            for r in matched:
+                self.client.trigger(self.table, r, None)
+            self.client.touch(self.table)
+            return FakeResponse(copy.deepcopy(matched))
+        for column, desc in reversed(self.orders):
+            matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        total = len(matched)
+        matched = matched[self.offset_n:]
+        if self.limit_n is not None:
+            matched = matched[: self.limit_n]
+        return FakeResponse([self._project(r) for r in matched], count=total if self.count else None)
+
+
+class FakeRpc:
+    def __init__(self, client, name, params):
+        self.client, self.name, self.params = client, name, params or {}
+
+    def execute(self):
+        with self.client.call():
+            return FakeResponse(self.client.rpcs[self.name](self.client, **self.params))
+
+
+class FakeSupabase:
+    def __init__(self, tables=None, rpcs=None, latency_ms=0):
+        self.tables = tables if tables is not None else {}
+        self.rpcs = dict(DEFAULT_RPCS)
+        self.rpcs.update(rpcs or {})
+        self.latency_ms = latency_ms  # aller-retour réseau simulé par appel
+        self.calls = 0
+        self._lock = threading.RLock()
+        self._indexes = {}
+        self._next_id = {}
+        self.settings = {}  # set_config(..., true) de la transaction en cours
+
+    def call(self):
+        # Un appel = une latence réseau (en parallèle entre threads) + un accès exclusif aux tables
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            self.calls += 1
+        return self._lock
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def from_(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+    def index(self, table, column):
+        key = (table, column)
+        if key not in self._indexes:
+            self._indexes[key] = {r.get(column): r for r in self.tables.get(table, [])}
+        return self._indexes[key]
+
+    @contextlib.contextmanager
+    def transaction(self, **settings):
+        # Réglages locaux à la RPC, comme set_config('app.xxx', ..., true) ; ceux posés par une
+        # RPC appelante restent visibles, sauf s'ils sont redéfinis
+        previous = self.settings
+        self.settings = {**previous, **settings}
+        try:
+            yield
+        finally:
+            self.settings = previous
+
+    def trigger(self, table, old, new):
+        if table in WATERMARKED:
+            if old is not None and new is not None:
+                new["updated_at"] = datetime.now(timezone.utc).isoformat()
+            elif new is None:
+                self.tables.setdefault("replica_deletions", []).append(self.fill_defaults("replica_deletions", {
+                    "table_name": table, "row_key": str(old["id"]),
+                }))
+        if table in TRIGGERS:
+            TRIGGERS[table](self, old, new)
+
+    def touch(self, table):
+        for key in [k for k in self._indexes if k[0] == table]:
+            del self._indexes[key]
+
+    def fill_defaults(self, table, row):
+        row = dict(row)
+        if "id" not in row:
+            rows = self.tables.get(table, [])
+            start = self._next_id.get(table) or (max((r["id"] for r in rows if isinstance(r.get("id"), int)), default=0) + 1)
+            row["id"] = start
+            self._next_id[table] = start + 1
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        if table in WATERMARKED:
+            row.setdefault("updated_at", row["created_at"])
+        return row
+
+
+# --- JOURNAL DE STOCK ---
+def _log_stock_movement(client, old, new):
+    # Même règles que le trigger log_stock_movement
+    if new is None:
+        delta, row, kind = -old["quantity"], old, "suppression"
+    elif old is None:
+        delta, row, kind = new["quantity"], new, "creation"
+    else:
+        delta, row, kind = new["quantity"] - old["quantity"], new, client.settings.get("reason") or "ajustement"
+    if delta == 0:
+        return
+    client.tables.setdefault("stock_movements", []).append(client.fill_defaults("stock_movements", {
+        "product_id": row["id"], "delta": delta, "quantity_after": 0 if new is None else new["quantity"],
+        "kind": kind, "order_id": client.settings.get("order_id") if new is not None and old is not None else None,
+        "unit_buy_cost": row.get("buy_price_cfa"), "note": client.settings.get("note") if new is not None else None,
+    }))
+    client.touch("stock_movements")
+
+
+def _set_stock(client, product, quantity, **settings):
+    # Update direct d'un produit (dans une RPC) en passant par le trigger
+    old = dict(product)
+    product["quantity"] = quantity
+    with client.transaction(**settings):
+        client.trigger("inventory", old, product)
+
+
+# --- AGRÉGATS DU COMPTE DE RÉSULTAT ---
+def _bump(client, table, keys, values, sign):
+    # Comme "insert ... on conflict do update set x = x + excluded.x"
+    rows = client.tables.setdefault(table, [])
+    target = next((r for r in rows if all(r[k] == v for k, v in keys.items())), None)
+    if target is None:
+        target = {**keys, **dict.fromkeys(values, 0)}
+        rows.append(target)
+    for name, value in values.items():
+        target[name] += sign * value
+    client.touch(table)
+
+
+def pnl_sales_row(order):
+    cost = order.get("unit_buy_cost_at_sale")
+    return (
+        {"month": order["created_at"][:7] + "-01", "product_id": order["product_id"], "source": order.get("marketing_source") or "Inconnu"},
+        {"orders": 1, "units": order["quantity_sold"], "revenue": order["total_amount_cfa"],
+         "cost": order["quantity_sold"] * (cost or 0), "units_without_cost": order["quantity_sold"] if cost is None else 0},
+    )
+
+
+def pnl_expenses_row(entry):
+    return (
+        {"month": entry["date"][:7] + "-01", "category": entry.get("category") or "Autre"},
+        {"entries": 1, "amount": entry["amount_cfa"]},
+    )
+
+
+def _pnl_orders(client, old, new):
+    # Même règles que le trigger pnl_sales_bump
+    if old is not None and old.get("status") == "Livré":
+        _bump(client, "pnl_sales_monthly", *pnl_sales_row(old), -1)
+    if new is not None and new.get("status") == "Livré":
+        _bump(client, "pnl_sales_monthly", *pnl_sales_row(new), 1)
+
+
+def _pnl_cashflow(client, old, new):
+    if old is not None and old.get("type") == "SORTIE":
+        _bump(client, "pnl_expenses_monthly", *pnl_expenses_row(old), -1)
+    if new is not None and new.get("type") == "SORTIE":
+        _bump(client, "pnl_expenses_monthly", *pnl_expenses_row(new), 1)
+
+
+TRIGGERS = {
+    "inventory": _log_stock_movement,
+    "orders": _pnl_orders,
+    "cashflow": _pnl_cashflow,
+}
+
+
+def _stock_at(client, p_at):
+    # Photo la plus proche avant p_at + mouvements depuis (sinon stock actuel - mouvements après p_at)
+    day = max((s["day"] for s in client.tables.get("stock_snapshots", []) if s["day"] <= p_at[:10]), default=None)
+    movements = client.tables.get("stock_movements", [])
+    stock, cost = {}, {}
+    if day is not None:
+        for snap in client.tables["stock_snapshots"]:
+            if snap["day"] == day:
+                stock[snap["product_id"]] = snap["quantity"]
+                cost[snap["product_id"]] = snap["buy_price_cfa"]
+        for m in sorted(movements, key=lambda m: (m["created_at"], m["id"])):
+            if day <= m["created_at"] and m["created_at"] <= p_at:
+                stock[m["product_id"]] = stock.get(m["product_id"], 0) + m["delta"]
+                if m.get("unit_buy_cost") is not None:
+                    cost[m["product_id"]] = m["unit_buy_cost"]
+    else:
+        for product in client.tables.get("inventory", []):
+            stock[product["id"]] = product["quantity"]
+            cost[product["id"]] = product["buy_price_cfa"]
+        for m in movements:
+            if m["created_at"] > p_at and m["product_id"] in stock:
+                stock[m["product_id"]] -= m["delta"]
+    return [{"product_id": pid, "quantity": q, "buy_price_cfa": cost.get(pid)} for pid, q in stock.items() if q != 0]
+
+
+def _take_stock_snapshot(client, p_day=None):
+    p_day = p_day or datetime.now(timezone.utc).date().isoformat()
+    since = {}
+    for m in client.tables.get("stock_movements", []):
+        if m["created_at"] >= p_day:
+            since[m["product_id"]] = since.get(m["product_id"], 0) + m["delta"]
+    snapshots = [s for s in client.tables.setdefault("stock_snapshots", []) if s["day"] != p_day]
+    inventory = client.tables.get("inventory", [])
+    snapshots.extend(
+        {"day": p_day, "product_id": p["id"], "quantity": p["quantity"] - since.get(p["id"], 0), "buy_price_cfa": p["buy_price_cfa"]}
+        for p in inventory
+    )
+    client.tables["stock_snapshots"] = snapshots
+    client.touch("stock_snapshots")
+    return len(inventory)
+
+
+def _import_inventory(client, p_rows, p_reason="ajustement", p_note=None):
+    rejected = []
+    with client.transaction(reason=p_reason, note=p_note):
+        if p_reason == "reassort":
+            # Quantités à ajouter au stock du moment (sous le verrou du client, comme le "for update")
+            products = client.index("inventory", "id")
+            rows = []
+            for row in p_rows:
+                current = products.get(row["id"])
+                final = (current["quantity"] if current else 0) + row["quantity"]
+                if final < 0:
+                    rejected.append({"id": row["id"], "message": f"stock final négatif ({final})"})
+                else:
+                    rows.append({**row, "quantity": final})
+            p_rows = rows
+        written = len(client.table("inventory").upsert(p_rows, on_conflict="id").execute().data) if p_rows else 0
+    return {"written": written, "rejected": rejected}
+
+
+def _process_sale(client, p_phone, p_product_id, p_qty, p_total, p_source):
+    product = client.index("inventory", "id").get(p_product_id)
+    if product is None or product["quantity"] < p_qty:
+        return {"success": False, "message": "Stock insuffisant"}
+    _set_stock(client, product, product["quantity"] - p_qty)
+    client.table("orders").insert({
+        "customer_phone": p_phone, "product_id": p_product_id,
+        "quantity_sold": p_qty, "total_amount_cfa": p_total,
+        "marketing_source": p_source, "status": "Livré",
+        "order_ref": None, "unit_buy_cost_at_sale": product["buy_price_cfa"],
+    }).execute()
+    return {"success": True, "message": "OK"}
+
+
+def _process_sales_once(client, p_sales):
+    applied = client.tables.setdefault("applied_writes", [])
+    done = {w["key"]: w["result"] for w in applied}
+    results = []
+    for sale in p_sales:
+        result = done.get(sale["key"])
+        if result is None:
+            try:
+                with client.transaction(reason="vente", order_id=None, note="Vente manuelle"):
+                    result = _process_sale(client, sale["phone"], sale["product_id"], sale["qty"], sale["total"], sale["source"])
+            except Exception as e:
+                # Comme le bloc exception de la RPC : cette vente seule est en échec, clé non retenue
+                results.append({"key": sale["key"], "success": False, "message": str(e)})
+                continue
+            if result["success"]:
+                # Un refus n'a rien écrit : la clé reste libre pour une nouvelle tentative
+                applied.append({"key": sale["key"], "result": result})
+                done[sale["key"]] = result
+        results.append({"key": sale["key"], **result})
+    return results
+
+
+def _traffic_breakdown(client, p_from=None, p_to=None):
+    counts = {}
+    for row in client.tables.get("site_traffic", []):
+        day = row["created_at"][:10]
+        if (p_from and day < p_from) or (p_to and day > p_to):
+            continue
+        for dimension in ("source", "device_type", "os"):
+            key = (dimension, row.get(dimension) or "Inconnu")
+            counts[key] = counts.get(key, 0) + 1
+    return [{"dimension": d, "value": v, "visits": n} for (d, v), n in counts.items()]
+
+
+def _traffic_daily_visits(client, p_from, p_to):
+    counts = {}
+    for row in client.tables.get("site_traffic", []):
+        day = row["created_at"][:10]
+        if p_from <= day <= p_to:
+            counts[day] = counts.get(day, 0) + 1
+    return [{"day": day, "visits": n} for day, n in sorted(counts.items())]
+
+
+def _normalize(value):
+    # normalize_text / normalize_phone de sql/search_orders.sql
+    value = unicodedata.normalize("NFKD", str(value or ""))
+    return " ".join("".join(c for c in value if not unicodedata.combining(c)).lower().split())
+
+
+def _normalize_phone(value):
+    digits = re.sub(r"\D", "", str(value or ""))
+    if digits.startswith("00225"):
+        return digits[5:]
+    if digits.startswith("225") and len(digits) > 10:
+        return digits[3:]
+    return digits
+
+
+def _search_orders(client, p_query, p_limit=200):
+    text, phone = _normalize(p_query.lstrip("#")), _normalize_phone(p_query)
+    products = {i["id"] for i in client.tables.get("inventory", []) if text in _normalize(i.get("product_name"))}
+    found = [
+        o for o in client.tables.get("orders", [])
+        if text in _normalize(o.get("order_ref"))
+        or (phone and not re.search(r"[a-z]", text) and phone in _normalize_phone(o.get("customer_phone")))
+        or o.get("product_id") in products
+    ]
+    found.sort(key=lambda o: (o["created_at"], o["id"]), reverse=True)
+    return [{"id": o["id"]} for o in found[:p_limit]]
+
+
+def _product_daily_units(client, p_from, p_to, p_after=None, p_limit=1000):
+    first = datetime.fromisoformat(p_from).date()
+    n_days = (datetime.fromisoformat(p_to).date() - first).days + 1
+    units = {}
+    for row in client.tables.get("orders", []):
+        day = row["created_at"][:10]
+        product_id = row.get("product_id")
+        if not (p_from <= day <= p_to) or row["status"] == "Annulé (Client)" or product_id is None:
+            continue
+        if p_after is not None and product_id <= p_after:
+            continue
+        series = units.setdefault(product_id, [0] * n_days)
+        series[(datetime.fromisoformat(day).date() - first).days] += row["quantity_sold"]
+    return [{"product_id": p, "units": units[p]} for p in sorted(units)[:p_limit]]
+
+
+def _deliver_orders(client, p_order_ids):
+    orders = client.index("orders", "id")
+    results = []
+    for order_id in p_order_ids:
+        order = orders.get(order_id)
+        if order is None:
+            results.append({"order_id": order_id, "success": False, "message": "Commande introuvable"})
+            continue
+        if order["status"] in ("Livré", "Annulé (Client)", "Annulé (Stock)"):
+            results.append({"order_id": order_id, "success": False, "message": f"Déjà terminée ({order['status']})"})
+            continue
+        product = client.index("inventory", "id").get(order["product_id"])
+        stock = product["quantity"] if product else 0
+        if stock < order["quantity_sold"]:
+            results.append({"order_id": order_id, "success": False, "message": f"Stock insuffisant ({stock})"})
+            continue
+        _set_stock(client, product, product["quantity"] - order["quantity_sold"], reason="vente", order_id=order_id)
+        old = dict(order)
+        order.update({"status": "Livré", "unit_buy_cost_at_sale": product["buy_price_cfa"]})
+        client.trigger("orders", old, order)
+        results.append({"order_id": order_id, "success": True, "message": "Livré"})
+    return results
+
+
+DEFAULT_RPCS = {
+    "deliver_orders": _deliver_orders,
+    "import_inventory": _import_inventory,
+    "process_sale": _process_sale,
+    "process_sales_once": _process_sales_once,
+    "product_daily_units": _product_daily_units,
+    "search_orders": _search_orders,
+    "stock_at": _stock_at,
+    "take_stock_snapshot": _take_stock_snapshot,
+    "traffic_breakdown": _traffic_breakdown,
+    "traffic_daily_visits": _traffic_daily_visits,
+}
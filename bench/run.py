@@ -0,0 +1,132 @@
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+# --- BENCHMARK DES PAGES ---
+# Exécute les pages de app.py de bout en bout (Streamlit AppTest) contre le faux Supabase,
+# pour des volumes synthétiques donnés. Aucune clé Supabase / Gemini nécessaire.
+#
+#   python -m bench.run --sizes 1k 10k 100k
+#   python -m bench.run --sizes 10k --out bench.json             # enregistre une référence
+#   python -m bench.run --sizes 10k --baseline bench.json         # échoue (code 1) si régression
+#
+# "froid" = caches vides (premier visiteur après un redémarrage), "chaud" = passage suivant.
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# AppTest tourne sans serveur Streamlit : on coupe les avertissements "no runtime" qui noient la sortie
+logging.disable(logging.WARNING)
+warnings.filterwarnings("ignore")
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import data  # noqa: E402
+from bench.datagen import generate, parse_size  # noqa: E402
+from bench.fake_supabase import FakeSupabase  # noqa: E402
+
+PAGES = {
+    "operations": "app_pages/operations.py",
+    "stocks": "app_pages/stocks.py",
+    "analytics": "app_pages/analytics.py",
+    "rentabilite": "app_pages/pnl.py",
+}
+SECRETS = {"url": "http://fake.local", "key": "fake", "app_password": "bench"}
+
+
+def _new_app(timeout):
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=timeout)
+    at.secrets["supabase"] = SECRETS
+    at.session_state["authenticated"] = True
+    return at
+
+
+def _open_page(at, page):
+    at.switch_page(page)
+
+
+def bench_page(fake, page, repeat, timeout):
+    at = _new_app(timeout)
+    at.run()
+    results = {}
+    for phase in ("froid", "chaud"):
+        timings, calls = [], []
+        for _ in range(repeat):
+            if phase == "froid":
+                st.cache_data.clear()
+                st.cache_resource.clear()
+            _open_page(at, page)
+            before = fake.calls
+            start = time.perf_counter()
+            at.run()
+            timings.append((time.perf_counter() - start) * 1000)
+            calls.append(fake.calls - before)
+            if at.exception:
+                raise RuntimeError(f"{page} : {at.exception[0].value}")
+        results[phase] = {"ms": round(statistics.median(timings), 1), "appels": max(calls)}
+    return results
+
+
+def run(sizes, pages, repeat=3, latency_ms=0, timeout=600):
+    report = []
+    for label in sizes:
+        n_rows = parse_size(label)
+        start = time.perf_counter()
+        fake = FakeSupabase(generate(n_rows), latency_ms=latency_ms)
+        print(f"[{label}] données générées en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        data.create_client = lambda url, key: fake
+        st.cache_resource.clear()
+        for name in pages:
+            result = bench_page(fake, PAGES[name], repeat, timeout)
+            for phase, values in result.items():
+                report.append({"taille": label, "page": name, "phase": phase, **values})
+                print(f"[{label}] {name:<10} {phase:<5} {values['ms']:>9.1f} ms  {values['appels']:>3} appel(s)", file=sys.stderr)
+    return report
+
+
+def compare(report, baseline, tolerance, floor_ms):
+    # Régression = plus lent que la référence de plus de `tolerance` ET de plus de `floor_ms`
+    reference = {(r["taille"], r["page"], r["phase"]): r["ms"] for r in baseline}
+    failures = []
+    for r in report:
+        ref = reference.get((r["taille"], r["page"], r["phase"]))
+        if ref is not None and r["ms"] > ref * (1 + tolerance) and r["ms"] - ref > floor_ms:
+            failures.append(f"{r['taille']} {r['page']} {r['phase']} : {ref:.0f} ms -> {r['ms']:.0f} ms")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des pages Sublime Heaven")
+    parser.add_argument("--sizes", nargs="+", default=["1k", "10k"], help="1k, 10k, 100k, 1m ou un nombre")
+    parser.add_argument("--pages", nargs="+", default=list(PAGES), choices=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0, help="latence réseau simulée par appel")
+    parser.add_argument("--out", help="fichier JSON où écrire les résultats")
+    parser.add_argument("--baseline", help="résultats de référence (JSON) à ne pas dépasser")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--floor-ms", type=float, default=20)
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.pages, args.repeat, args.latency_ms)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.baseline:
+        failures = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance, args.floor_ms)
+        for failure in failures:
+            print(f"RÉGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
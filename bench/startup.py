@@ -0,0 +1,90 @@
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+# --- BENCHMARK DU DÉMARRAGE ---
+# Mesure le "premier affichage" après un redémarrage du conteneur : chaque essai tourne dans un
+# processus Python neuf (aucun module de l'app déjà importé), contre le faux Supabase.
+#
+#   python -m bench.startup --repeat 5
+#
+# "import" = streamlit + supabase (payé par le serveur avant tout visiteur),
+# "premier rendu" = premier passage du script pour la page d'accueil (imports de l'app compris).
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["google.generativeai", "plotly.express", "pyarrow"]
+
+
+def child(n_rows):
+    # Exécuté dans le processus neuf : renvoie les mesures en JSON sur stdout
+    start = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings("ignore")
+
+    from streamlit.testing.v1 import AppTest
+
+    import data
+    from bench.datagen import generate
+    from bench.fake_supabase import FakeSupabase
+    imported = time.perf_counter()
+
+    fake = FakeSupabase(generate(n_rows))
+    data.create_client = lambda url, key: fake
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+    at.secrets["supabase"] = {"url": "http://fake.local", "key": "fake", "app_password": "bench"}
+    at.session_state["authenticated"] = True
+    first = time.perf_counter()
+    at.run()
+    rendered = time.perf_counter()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    print(json.dumps({
+        "import_ms": round((imported - start) * 1000, 1),
+        "premier_rendu_ms": round((rendered - first) * 1000, 1),
+        "modules_lourds": [m for m in HEAVY_MODULES if m in sys.modules],
+    }))
+
+
+def run(repeat, n_rows):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.startup", "--child", "--rows", str(n_rows)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        result["processus_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        runs.append(result)
+    return {
+        "import_ms": statistics.median(r["import_ms"] for r in runs),
+        "premier_rendu_ms": statistics.median(r["premier_rendu_ms"] for r in runs),
+        "processus_ms": statistics.median(r["processus_ms"] for r in runs),
+        "modules_lourds": runs[-1]["modules_lourds"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps de premier affichage après redémarrage")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=1000, help="commandes synthétiques")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.rows)
+        return 0
+    print(json.dumps(run(args.repeat, args.rows), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
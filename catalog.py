@@ -0,0 +1,244 @@
+import csv
+import io
+import re
+
+import pandas as pd
+
+from data import get_inventory_after, upsert_inventory
+from search import normalize_text
+
+# --- IMPORT / EXPORT DU CATALOGUE ---
+# Le fichier est lu ligne à ligne (CSV ou XLSX), chaque ligne est validée et comparée à l'inventaire
+# actuel : on obtient un aperçu des changements et un rapport d'erreurs avant d'écrire quoi que ce soit.
+# L'écriture se fait par lots : un upsert (conflit sur "id") = un aller-retour pour CHUNK_SIZE produits.
+
+COLUMNS = ["id", "product_name", "quantity", "buy_price_cfa", "sell_price_cfa"]
+NUMERIC = ["quantity", "buy_price_cfa", "sell_price_cfa"]
+CHUNK_SIZE = 500
+
+# En-têtes acceptés (normalisés : minuscules, sans accents) -> colonne de la table
+HEADER_ALIASES = {
+    "id": "id", "code": "id", "sku": "id", "code (sku)": "id", "code produit": "id",
+    "product_name": "product_name", "produit": "product_name", "nom": "product_name", "nom du produit": "product_name",
+    "quantity": "quantity", "stock": "quantity", "quantite": "quantity", "qte": "quantity",
+    "buy_price_cfa": "buy_price_cfa", "prix achat": "buy_price_cfa", "prix d'achat": "buy_price_cfa", "cout": "buy_price_cfa",
+    "sell_price_cfa": "sell_price_cfa", "prix vente": "sell_price_cfa", "prix de vente": "sell_price_cfa", "prix": "sell_price_cfa",
+}
+FIELD_LABELS = {
+    "product_name": "nom", "quantity": "stock", "buy_price_cfa": "prix achat", "sell_price_cfa": "prix vente",
+}
+
+
+# --- LECTURE EN FLUX ---
+def _columns(header):
+    # En-têtes du fichier -> nom de colonne (None pour une colonne ignorée)
+    columns = [HEADER_ALIASES.get(normalize_text(h).strip(" *")) for h in header]
+    if "id" not in columns:
+        raise ValueError("Colonne du code produit introuvable (attendu : id, code ou sku).")
+    return columns
+
+
+def _csv_rows(file):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    yield from csv.reader(text, dialect)
+
+
+def _xlsx_rows(file):
+    from openpyxl import load_workbook  # seulement pour les fichiers Excel
+
+    # read_only : les lignes sont lues au fil de l'eau, sans charger toute la feuille
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(file, name):
+    # Génère (n° de ligne du fichier, {colonne: valeur brute}) ; les lignes vides sont sautées
+    rows = _xlsx_rows(file) if name.lower().endswith((".xlsx", ".xlsm")) else _csv_rows(file)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Fichier vide.")
+    columns = _columns(["" if h is None else str(h) for h in header])
+    for line, values in enumerate(rows, start=2):
+        row = {col: value for col, value in zip(columns, values) if col is not None}
+        if any(v not in (None, "") for v in row.values()):
+            yield line, row
+
+
+# --- VALIDATION ---
+def _parse_int(value):
+    # "12 500", "12 500 CFA", "12.500", "+5", 25.0 -> 12500 / 5 / 25 ; None si vide ; ValueError sinon
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"« {value} » n'est pas un nombre entier")
+        return int(value)
+    if isinstance(value, int):
+        return value
+    text = re.sub(r"(?i)f?cfa|\s", "", str(value))
+    if not text:
+        return None
+    if re.fullmatch(r"\d{1,3}([.,]\d{3})+", text):
+        text = re.sub(r"[.,]", "", text)
+    text = re.sub(r"[.,]0+$", "", text)
+    if not re.fullmatch(r"[-+]?\d+", text):
+        raise ValueError(f"« {value} » n'est pas un nombre entier")
+    return int(text)
+
+
+def _validate(row, current, add_quantity):
+    # Ligne du fichier + produit actuel (ou None) -> (enregistrement complet, liste d'erreurs)
+    # En réassort, l'enregistrement porte aussi "ajout" : la quantité du fichier, seule envoyée
+    # à la base (le stock affiché n'est qu'un aperçu, calculé sur l'inventaire lu)
+    errors = []
+    product_id = str(row.get("id") or "").strip()
+    if not product_id:
+        return None, ["code produit manquant"]
+
+    values = {}
+    for col in NUMERIC:
+        try:
+            values[col] = _parse_int(row.get(col))
+        except ValueError as e:
+            errors.append(f"{FIELD_LABELS[col]} : {e}")
+            continue
+        if values[col] is not None and values[col] < 0 and not (col == "quantity" and add_quantity):
+            errors.append(f"{FIELD_LABELS[col]} négatif ({values[col]})")
+    name = str(row.get("product_name") or "").strip() or None
+
+    if current is None:
+        if name is None:
+            errors.append("nom obligatoire pour un nouveau produit")
+        base = {"id": product_id, "product_name": name, "quantity": 0, "buy_price_cfa": 0, "sell_price_cfa": 0}
+    else:
+        base = {"id": product_id, **{col: current[col] for col in COLUMNS[1:]}}
+    if errors:
+        return None, errors
+
+    record = dict(base)
+    if name is not None:
+        record["product_name"] = name
+    for col in NUMERIC:
+        if values[col] is not None:
+            record[col] = values[col]
+    added = 0
+    if add_quantity and values["quantity"] is not None:
+        # Réassort : la quantité du fichier s'ajoute au stock actuel (revérifié par la base à l'écriture)
+        added = values["quantity"]
+        record["quantity"] = int(base["quantity"]) + added
+        if record["quantity"] < 0:
+            return None, [f"stock final négatif ({record['quantity']})"]
+    prices_given = values["buy_price_cfa"] is not None or values["sell_price_cfa"] is not None
+    if prices_given and 0 < int(record["sell_price_cfa"]) < int(record["buy_price_cfa"]):
+        return None, [f"prix vente ({record['sell_price_cfa']}) inférieur au prix achat ({record['buy_price_cfa']})"]
+    return {**{col: (int(record[col]) if col in NUMERIC else record[col]) for col in COLUMNS}, "ajout": added}, []
+
+
+def plan_import(rows, inventory, add_quantity=False):
+    # Compare le fichier à l'inventaire -> (changements, erreurs), deux DataFrames :
+    #   changements : ligne, action (nouveau / modifié / inchangé), détail + colonnes de la table
+    #   erreurs     : ligne, id, erreur
+    current = inventory.set_index("id").to_dict("index") if not inventory.empty else {}
+    seen, changes, errors = {}, [], []
+    for line, row in rows:
+        product_id = str(row.get("id") or "").strip()
+        if product_id in seen:
+            errors.append({"ligne": line, "id": product_id, "erreur": f"code déjà présent ligne {seen[product_id]}"})
+            continue
+        existing = current.get(product_id)
+        record, problems = _validate(row, existing, add_quantity)
+        if problems:
+            errors.extend({"ligne": line, "id": product_id, "erreur": p} for p in problems)
+            continue
+        seen[product_id] = line
+        if existing is None:
+            action, detail = "nouveau", ""
+        else:
+            diffs = [
+                f"{FIELD_LABELS[col]} : {existing[col]} → {record[col]}"
+                for col in COLUMNS[1:] if str(existing[col]) != str(record[col])
+            ]
+            action, detail = ("modifié" if diffs else "inchangé"), " ; ".join(diffs)
+        changes.append({"ligne": line, "action": action, "détail": detail, **record})
+    return (
+        pd.DataFrame(changes, columns=["ligne", "action", "détail", *COLUMNS, "ajout"]),
+        pd.DataFrame(errors, columns=["ligne", "id", "erreur"]),
+    )
+
+
+# --- ÉCRITURE PAR LOTS ---
+def apply_import(changes, add_quantity=False, note=None, progress=None):
+    # Upsert des lignes nouvelles / modifiées par lots de CHUNK_SIZE.
+    # Un lot refusé n'arrête pas les suivants : ses lignes passent dans le rapport d'erreurs.
+    # Les changements de stock sont journalisés en "reassort" (quantités ajoutées) ou "ajustement".
+    # En réassort, seules les quantités ajoutées partent : la base les applique au stock du moment,
+    # une vente validée entre l'aperçu et l'écriture n'est pas écrasée.
+    todo = changes[changes["action"] != "inchangé"]
+    reason = "reassort" if add_quantity else "ajustement"
+    written, errors = 0, []
+    for start in range(0, len(todo), CHUNK_SIZE):
+        chunk = todo.iloc[start:start + CHUNK_SIZE]
+        records = chunk[COLUMNS].assign(quantity=chunk["ajout"]) if add_quantity else chunk[COLUMNS]
+        try:
+            result = upsert_inventory(records.to_dict("records"), reason, note)
+            written += result["written"]
+            lines = dict(zip(chunk["id"], chunk["ligne"]))
+            errors.extend({"ligne": lines.get(r["id"]), "id": r["id"], "erreur": r["message"]} for r in result["rejected"])
+        except Exception as e:
+            errors.extend({"ligne": line, "id": pid, "erreur": f"lot refusé : {e}"} for line, pid in zip(chunk["ligne"], chunk["id"]))
+        if progress:
+            progress(min(start + CHUNK_SIZE, len(todo)), len(todo))
+    return written, pd.DataFrame(errors, columns=["ligne", "id", "erreur"])
+
+
+# --- EXPORT EN FLUX ---
+# export_csv / export_xlsx sont passés tels quels à st.download_button : rien n'est calculé tant que
+# personne ne clique, puis le fichier est écrit page par page (ni DataFrame complète, ni liste de
+# toutes les lignes). Streamlit garde ensuite le fichier final pour le servir.
+def _inventory_pages():
+    # Le catalogue page par page (ordre des codes), sans jamais tout garder en mémoire
+    after = None
+    while True:
+        page = get_inventory_after(after)
+        if not page:
+            return
+        yield page
+        after = page[-1]["id"]
+
+
+def export_csv():
+    out = io.BytesIO()
+    text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text, delimiter=";")
+    writer.writerow(COLUMNS)
+    for page in _inventory_pages():
+        writer.writerows([row.get(col) for col in COLUMNS] for row in page)
+    text.flush()
+    text.detach()
+    out.seek(0)
+    return out
+
+
+def export_xlsx():
+    from openpyxl import Workbook  # seulement pour les fichiers Excel
+
+    # write_only : les lignes partent dans le fichier au fur et à mesure
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("inventaire")
+    sheet.append(COLUMNS)
+    for page in _inventory_pages():
+        for row in page:
+            sheet.append([row.get(col) for col in COLUMNS])
+    out = io.BytesIO()
+    workbook.save(out)
+    out.seek(0)
+    return out
@@ -0,0 +1,189 @@
+import threading
+from datetime import datetime, time, timedelta, timezone
+
+import pandas as pd
+import streamlit as st
+
+from data import DONE_STATUSES, DAY_COLUMNS, cached_reader, init_connection, get_orders_between, get_daily_visits
+from schema import orders_frame
+
+# --- AGRÉGATS JOURNALIERS (page Analytics) ---
+# Les indicateurs sont calculés par jour (UTC, comme traffic_daily) puis additionnés sur la période :
+# une période coûte O(jours), pas O(commandes).
+# Une commande terminée (livrée / annulée) ne change plus : pour chaque jour passé, ses commandes
+# terminées sont agrégées une seule fois par processus et gardées en mémoire. Seules les commandes
+# encore en cours de ces jours sont relues (par id), et aujourd'hui est recalculé en entier,
+# au rythme du cache des commandes.
+
+TOTAL_COLUMNS = ["ca_reel", "ca_total", "commandes", "unites", "visiteurs"]
+IDS_PER_QUERY = 200
+
+
+class DailyStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.days = {}      # jour passé -> partition des commandes terminées (+ visiteurs)
+        self.pending = {}   # id de commande encore en cours -> jour de création
+
+
+@st.cache_resource
+def _store():
+    return DailyStore()
+
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+
+def _bounds(first, last):
+    # [first 00:00, last+1 00:00[ en UTC, au format ISO
+    start = datetime.combine(first, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(last + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    return start.isoformat(), end.isoformat()
+
+
+def _runs(days):
+    # Jours triés -> suites de jours consécutifs [(premier, dernier)], une requête par suite
+    runs = []
+    for day in sorted(days):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(r) for r in runs]
+
+
+def _empty_partition():
+    # Une partition = quelques dizaines de nombres : de simples dicts (additionner des Series
+    # pandas jour par jour coûterait plus cher que le calcul lui-même)
+    return {"totaux": dict.fromkeys(TOTAL_COLUMNS, 0), "produits": {}, "statuts": {}}
+
+
+def _merge(partition, other):
+    # Ajoute other à partition (en place)
+    for key in ("totaux", "produits", "statuts"):
+        target = partition[key]
+        for name, value in other[key].items():
+            target[name] = target.get(name, 0) + value
+    return partition
+
+
+def _aggregate(orders):
+    # Commandes -> {jour: partition} (sans les visiteurs)
+    if orders.empty:
+        return {}
+    day = orders["created_at"].dt.date.rename("day")
+    amount = orders["total_amount_cfa"].astype("int64")
+    totals = pd.DataFrame({
+        "ca_reel": amount.where(orders["status"] == "Livré", 0),
+        "ca_total": amount,
+        "commandes": 1,
+        "unites": orders["quantity_sold"].astype("int64"),
+    }).groupby(day).sum()
+    products = orders.groupby([day, orders["product_id"].astype(str)])["quantity_sold"].sum().astype("int64")
+    statuses = orders.groupby([day, orders["status"].astype(str)]).size().astype("int64")
+
+    partitions = {}
+    for d, row in zip(totals.index, totals.to_dict("records")):
+        partitions[d] = _empty_partition()
+        partitions[d]["totaux"].update({k: int(v) for k, v in row.items()})
+    for (d, product_id), units in products.items():
+        partitions[d]["produits"][product_id] = int(units)
+    for (d, status), count in statuses.items():
+        partitions[d]["statuts"][status] = int(count)
+    return partitions
+
+
+def _load_days(first, last):
+    # Premier passage sur des jours passés : commandes terminées agrégées et gardées,
+    # ids des commandes en cours notés pour être relus
+    orders = get_orders_between(*_bounds(first, last))
+    visits = get_daily_visits(first, last).set_index("day")["visits"]
+    partitions, pending = {}, {}
+    if not orders.empty:
+        done = orders["status"].isin(DONE_STATUSES)
+        partitions = _aggregate(orders[done])
+        pending = dict(zip(orders.loc[~done, "id"].tolist(), orders.loc[~done, "created_at"].dt.date))
+
+    store = _store()
+    with store.lock:
+        for day in pd.date_range(first, last, freq="D").date:
+            partition = partitions.get(day, _empty_partition())
+            partition["totaux"]["visiteurs"] = int(visits.get(day, 0))
+            store.days[day] = partition
+        store.pending.update(pending)
+
+
+def _get_orders_by_id(order_ids):
+    rows = []
+    for i in range(0, len(order_ids), IDS_PER_QUERY):
+        chunk = list(order_ids[i:i + IDS_PER_QUERY])
+        rows.extend(init_connection().table("orders").select(DAY_COLUMNS).in_("id", chunk).execute().data)
+    return orders_frame(rows)
+
+
+@cached_reader("orders")
+def _pending_orders(order_ids):
+    # Relit les commandes encore en cours : celles terminées depuis rejoignent la partition de leur jour
+    # (une seule fois : l'id sort de store.pending), les autres sont renvoyées telles quelles
+    orders = _get_orders_by_id(order_ids)
+    if orders.empty:
+        return orders
+    done = orders["status"].isin(DONE_STATUSES)
+    store = _store()
+    with store.lock:
+        finished = orders[done & orders["id"].isin(list(store.pending))]
+        for day, partition in _aggregate(finished).items():
+            _merge(store.days[day], partition)
+        for order_id in finished["id"].tolist():
+            store.pending.pop(order_id, None)
+    return orders[~done]
+
+
+@cached_reader("orders", "site_traffic")
+def _today_partition(today):
+    # Aujourd'hui : tout est recalculé (nouvelles commandes, statuts qui bougent, visites)
+    partition = _aggregate(get_orders_between(*_bounds(today, today))).get(today, _empty_partition())
+    partition["totaux"]["visiteurs"] = int(get_daily_visits(today, today)["visits"].sum())
+    return partition
+
+
+def period_stats(start, end):
+    # Indicateurs de [start, end] (dates incluses) :
+    #   "jours"    : DataFrame indexée par jour (ca_reel, ca_total, commandes, unites, visiteurs, conversion)
+    #   "produits" : unités vendues par product_id
+    #   "statuts"  : nombre de commandes par statut
+    today = utc_today()
+    days = list(pd.date_range(start, min(end, today), freq="D").date)
+    past = [d for d in days if d < today]
+    store = _store()
+    with store.lock:
+        unknown = [d for d in past if d not in store.days]
+    for first, last in _runs(unknown):
+        _load_days(first, last)
+
+    with store.lock:
+        in_range = set(past)
+        pending_ids = tuple(sorted(i for i, d in store.pending.items() if d in in_range))
+    still_pending = _aggregate(_pending_orders(pending_ids)) if pending_ids else {}
+
+    with store.lock:
+        partitions = {d: _merge(_empty_partition(), store.days[d]) for d in past}
+    for day, partition in still_pending.items():
+        _merge(partitions[day], partition)
+    if today in days:
+        partitions[today] = _today_partition(today)
+
+    daily = pd.DataFrame(
+        [partitions[d]["totaux"] for d in days], index=pd.Index(days, name="jour"), columns=TOTAL_COLUMNS,
+    )
+    daily["conversion"] = (daily["commandes"] / daily["visiteurs"].where(daily["visiteurs"] > 0) * 100).round(2)
+
+    total = _empty_partition()
+    for d in days:
+        _merge(total, partitions[d])
+
+    def ranked(counts):
+        return pd.Series(counts, dtype="int64").sort_values(ascending=False)
+
+    return {"jours": daily, "produits": ranked(total["produits"]), "statuts": ranked(total["statuts"])}
@@ -0,0 +1,485 @@
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from supabase import create_client
+
+from dataservice import DataService, SHARED_TTL
+from perf import InstrumentedClient
+from replica import Replica, SYNC_EVERY, timestamp
+from schema import orders_frame, cast_orders, inventory_frame, traffic_frame, movements_frame, stock_frame,\
+    monthly_frame, EMBEDDED_INVENTORY
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION DU CACHE ---
+# Durée de vie (secondes) des lectures, par table Supabase.
+# L'inventaire bouge peu, les commandes arrivent en continu depuis le site.
+TABLE_TTL = {
+    "inventory": 300,
+    "orders": 60,
+    "cashflow": 600,
+    "site_traffic": 300,
+}
+
+_stats_lock = threading.Lock()
+_stats = {}    # table -> {"appels": n, "chargements": n, "invalidations": n}
+_readers = {}  # table -> [fonctions en cache qui dépendent de cette table]
+_replicas = []  # réplique locale ouverte (au plus une), prévenue par invalidate()
+_services = []  # service de données partagé (au plus un), vidé par invalidate()
+
+# Statuts d'une commande terminée (onglet Historique)
+DONE_STATUSES = ['Livré', 'Annulé (Client)', 'Annulé (Stock)']
+ORDER_COLUMNS = "*, inventory(product_name, quantity, buy_price_cfa)"
+DAY_COLUMNS = "id, created_at, status, product_id, quantity_sold, total_amount_cfa"
+HISTORY_PAGE_SIZE = 100
+REPLICA_PATH = ".cache/replica.sqlite3"
+MOVEMENTS_PAGE_SIZE = 500
+KEYS_PAGE_SIZE = 1000
+MAX_PARALLEL_QUERIES = 4
+
+
+@st.cache_resource
+def init_connection():
+    url = st.secrets["supabase"]["url"]
+    key = st.secrets["supabase"]["key"]
+    # Un seul client pour tout le processus : lectures identiques regroupées et partagées
+    # quelques secondes entre sessions (dataservice.py), mesures par session (perf.py)
+    service = DataService(create_client(url, key), st.secrets.get("data", {}).get("shared_ttl", SHARED_TTL))
+    _services.append(service)
+    return InstrumentedClient(service)
+
+
+@st.cache_resource
+def get_replica():
+    # Réplique SQLite locale (replica.py), si [replica] enabled = true dans les secrets ; None sinon.
+    # Les lectures ci-dessous passent alors par elle, les écritures restent envoyées à Supabase.
+    config = st.secrets.get("replica", {})
+    if not config.get("enabled"):
+        return None
+    replica = Replica(config.get("path", REPLICA_PATH), init_connection(), config.get("sync_every", SYNC_EVERY))
+    _replicas.append(replica)
+    return replica
+
+
+def _count(tables, field):
+    with _stats_lock:
+        for table in tables:
+            entry = _stats.setdefault(table, {"appels": 0, "chargements": 0, "invalidations": 0})
+            entry[field] += 1
+
+
+def cached_reader(*tables):
+    # Met en cache une lecture Supabase avec le TTL le plus court des tables lues,
+    # et l'enregistre pour que invalidate() ne vide que ce qui est concerné.
+    ttl = min(TABLE_TTL[t] for t in tables)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def load(*args, **kwargs):
+            # Ce corps ne s'exécute qu'en cas d'absence dans le cache
+            _count(tables, "chargements")
+            return func(*args, **kwargs)
+
+        cached = st.cache_data(ttl=ttl, show_spinner=False)(load)
+        for table in tables:
+            _readers.setdefault(table, []).append(cached)
+
+        @functools.wraps(func)
+        def reader(*args, **kwargs):
+            _count(tables, "appels")
+            return cached(*args, **kwargs)
+
+        reader.clear = cached.clear
+        return reader
+
+    return decorator
+
+
+def invalidate(*tables):
+    # À appeler après chaque écriture : vide uniquement les lectures des tables touchées
+    for table in tables:
+        for cached in _readers.get(table, []):
+            cached.clear()
+    for replica in _replicas:
+        replica.mark_stale(*tables)
+    for service in _services:
+        service.forget()
+    _count(tables, "invalidations")
+
+
+def table_generation(table):
+    # Change à chaque invalidation : permet aux données gardées en session de savoir qu'elles sont périmées
+    with _stats_lock:
+        return _stats.get(table, {}).get("invalidations", 0)
+
+
+def cache_stats():
+    with _stats_lock:
+        rows = [{"table": t, **s} for t, s in sorted(_stats.items())]
+    df = pd.DataFrame(rows, columns=["table", "appels", "chargements", "invalidations"])
+    df["hits"] = df["appels"] - df["chargements"]
+    df["misses"] = df["chargements"]
+    df["taux_hit"] = (df["hits"] / df["appels"].where(df["appels"] > 0)).fillna(0).round(2)
+    return df[["table", "hits", "misses", "taux_hit", "invalidations"]]
+
+
+def service_stats():
+    # Requêtes Supabase demandées / réellement envoyées ; économisées = regroupées en vol + partagées
+    return _services[0].stats() if _services else None
+
+
+# --- EXÉCUTION PARALLÈLE ---
+@st.cache_resource
+def _query_pool():
+    return ThreadPoolExecutor(max_workers=MAX_PARALLEL_QUERIES, thread_name_prefix="supabase")
+
+
+def fetch_parallel(**loaders):
+    # Lance des lectures indépendantes en même temps et attend toutes les réponses :
+    # fetch_parallel(orders=get_orders, traffic=get_traffic_breakdown) -> {"orders": df, "traffic": df}
+    # La latence de la page devient celle de la requête la plus lente, pas leur somme.
+    ctx = get_script_run_ctx()
+    timings = {}
+
+    def run(name, loader):
+        # Le contexte Streamlit permet au cache et à la session de fonctionner dans le thread
+        add_script_run_ctx(threading.current_thread(), ctx)
+        start = time.perf_counter()
+        try:
+            return loader()
+        finally:
+            timings[name] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    futures = {name: _query_pool().submit(run, name, loader) for name, loader in loaders.items()}
+    results = {name: future.result() for name, future in futures.items()}
+    total = (time.perf_counter() - start) * 1000
+    logger.info(
+        "fetch_parallel %s | total %.0f ms (séquentiel : %.0f ms)",
+        ", ".join(f"{name}={ms:.0f} ms" for name, ms in timings.items()), total, sum(timings.values()),
+    )
+    return results
+
+
+# --- LECTURES ---
+# Avec la réplique locale, chaque lecture devient une requête SQL sur la copie (filtres, tris et
+# group by faits par SQLite) ; sans elle, la même requête part vers Supabase.
+def _local_orders(where="1", params=(), order="o.created_at desc, o.id desc", limit=None, embed=tuple(EMBEDDED_INVENTORY)):
+    # Équivalent local de select("*, inventory(...)") sur orders : colonnes du produit déjà à plat
+    fields = "".join(f", i.{src} as {EMBEDDED_INVENTORY[src]}" for src in embed)
+    sql = f"select o.*{fields} from orders o left join inventory i on i.id = o.product_id where {where} order by {order}"
+    if limit is not None:
+        sql += f" limit {int(limit)}"
+    df = get_replica().query(sql, params, tables=("orders", "inventory"))
+    if 'product_name' in df:
+        df['product_name'] = df['product_name'].fillna("Produit Inconnu")
+    return orders_frame(df)
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+@cached_reader("inventory")
+def get_inventory():
+    if get_replica() is not None:
+        return inventory_frame(get_replica().query("select * from inventory order by id", tables=("inventory",)))
+    response = init_connection().table("inventory").select("*").order('id').execute()
+    return inventory_frame(response.data)
+
+
+@cached_reader("orders", "inventory")
+def get_orders():
+    if get_replica() is not None:
+        return _local_orders(embed=("product_name",))
+    response = init_connection().table("orders").select("*, inventory(product_name)").order('created_at', desc=True).execute()
+    return orders_frame(response.data)
+
+
+@cached_reader("orders", "inventory")
+def get_pending_web_orders():
+    # Filtre côté serveur : seules les commandes non terminées voyagent
+    # Cela inclut "En attente", "En attente Web", "Nouveau", etc.
+    if get_replica() is not None:
+        return _local_orders(f"o.status not in ({_placeholders(DONE_STATUSES)})", DONE_STATUSES)
+    response = init_connection().table("orders")\
+        .select(ORDER_COLUMNS)\
+        .not_.in_("status", DONE_STATUSES)\
+        .order('created_at', desc=True)\
+        .order('id', desc=True)\
+        .execute()
+    return orders_frame(response.data)
+
+
+@cached_reader("site_traffic")
+def get_traffic_breakdown(start=None, end=None):
+    # Comptes par source / appareil / OS, calculés par Postgres sur les agrégats journaliers
+    # (voir sql/traffic_rollups.sql) : aucune ligne brute de site_traffic ne transite.
+    # start / end (dates, incluses) limitent la période ; sans eux, tout l'historique.
+    if get_replica() is not None:
+        bounds = (start.isoformat() if start else "", (end + timedelta(days=1)).isoformat() if end else "9999")
+        sql = " union all ".join(
+            f"select '{dim}' as dimension, coalesce({dim}, 'Inconnu') as value, count(*) as visits from site_traffic "
+            f"where created_at >= ? and created_at < ? group by 2"
+            for dim in ("source", "device_type", "os")
+        )
+        return traffic_frame(get_replica().query(sql, bounds * 3, tables=("site_traffic",)))
+    params = {}
+    if start is not None:
+        params["p_from"] = start.isoformat()
+    if end is not None:
+        params["p_to"] = end.isoformat()
+    response = init_connection().rpc("traffic_breakdown", params).execute()
+    return traffic_frame(response.data)
+
+
+def get_daily_visits(start, end):
+    # Visites par jour (dates incluses), lues dans traffic_daily. Pas de cache ici :
+    # c'est daily_stats qui garde les jours clos.
+    if get_replica() is not None:
+        df = get_replica().query(
+            "select substr(created_at, 1, 10) as day, count(*) as visits from site_traffic "
+            "where created_at >= ? and created_at < ? group by 1 order by 1",
+            (start.isoformat(), (end + timedelta(days=1)).isoformat()), tables=("site_traffic",),
+        )
+    else:
+        response = init_connection().rpc("traffic_daily_visits", {"p_from": start.isoformat(), "p_to": end.isoformat()}).execute()
+        df = pd.DataFrame(response.data, columns=["day", "visits"])
+    df["day"] = pd.to_datetime(df["day"]).dt.date
+    df["visits"] = df["visits"].astype("int64")
+    return df
+
+
+def get_daily_units(start, end):
+    # Unités demandées par jour (lignes, dates incluses) et par produit (colonnes), jours sans
+    # vente à 0 ; annulations du client exclues. Pas de cache ici : c'est replenishment qui garde
+    # le résultat pour la journée.
+    days = pd.date_range(start, end, freq="D")
+    if get_replica() is not None:
+        long = get_replica().query(
+            "select substr(created_at, 1, 10) as day, product_id, sum(quantity_sold) as units from orders "
+            "where created_at >= ? and created_at < ? and status <> 'Annulé (Client)' and product_id is not null "
+            "group by 1, 2",
+            (start.isoformat(), (end + timedelta(days=1)).isoformat()), tables=("orders",),
+        )
+        long["day"] = pd.to_datetime(long["day"])
+        wide = long.pivot(index="day", columns="product_id", values="units")
+        return wide.reindex(days).fillna(0).astype("int64").rename_axis(index="day", columns="product_id")
+
+    product_ids, series, after = [], [], None
+    while True:
+        params = {"p_from": start.isoformat(), "p_to": end.isoformat(), "p_limit": KEYS_PAGE_SIZE}
+        if after is not None:
+            params["p_after"] = after
+        page = init_connection().rpc("product_daily_units", params).execute().data
+        product_ids += [r["product_id"] for r in page]
+        series += [r["units"] for r in page]
+        if len(page) < KEYS_PAGE_SIZE:
+            break
+        after = page[-1]["product_id"]
+    units = np.array(series, dtype="int64").reshape(len(series), len(days)).T
+    return pd.DataFrame(units, index=days, columns=pd.Index(product_ids, name="product_id")).rename_axis(index="day")
+
+
+# Agrégats mensuels du compte de résultat (sql/pnl_rollups.sql), tenus à jour par trigger :
+# quelques centaines de lignes par an, quel que soit le nombre de commandes. Toujours lus sur
+# Supabase, même avec la réplique : les recalculer depuis la copie des commandes coûterait plus.
+@cached_reader("orders")
+def get_monthly_sales(start, end):
+    # Ventes livrées par mois x produit x source, mois start..end (premiers du mois, inclus)
+    response = init_connection().table("pnl_sales_monthly")\
+        .select("month, product_id, source, orders, units, revenue, cost, units_without_cost")\
+        .gte('month', start.isoformat())\
+        .lte('month', end.isoformat())\
+        .execute()
+    return monthly_frame(response.data, ["product_id", "source"], ["orders", "units", "revenue", "cost", "units_without_cost"])
+
+
+@cached_reader("cashflow")
+def get_monthly_expenses(start, end):
+    # Dépenses (SORTIE) par mois x catégorie
+    response = init_connection().table("pnl_expenses_monthly")\
+        .select("month, category, entries, amount")\
+        .gte('month', start.isoformat())\
+        .lte('month', end.isoformat())\
+        .execute()
+    return monthly_frame(response.data, ["category"], ["entries", "amount"])
+
+
+def _completed_orders():
+    return init_connection().table("orders")\
+        .select(ORDER_COLUMNS)\
+        .in_("status", DONE_STATUSES)\
+        .order('created_at', desc=True)\
+        .order('id', desc=True)
+
+
+@cached_reader("orders", "inventory")
+def get_completed_orders_page(cursor=None, limit=HISTORY_PAGE_SIZE):
+    # Pagination par clé (created_at, id) : le coût d'une page ne dépend pas de sa position
+    if get_replica() is not None:
+        where, params = f"o.status in ({_placeholders(DONE_STATUSES)})", list(DONE_STATUSES)
+        if cursor is not None:
+            where += " and (o.created_at < ? or (o.created_at = ? and o.id < ?))"
+            params += [timestamp(cursor[0]), timestamp(cursor[0]), cursor[1]]
+        return _local_orders(where, params, limit=limit)
+    query = _completed_orders()
+    if cursor is not None:
+        created_at, order_id = cursor
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{order_id})')
+    return orders_frame(query.limit(limit).execute().data)
+
+
+@cached_reader("orders", "inventory")
+def get_completed_orders_since(watermark):
+    # Mode incrémental : uniquement les lignes plus récentes que le dernier filigrane
+    if get_replica() is not None:
+        return _local_orders(f"o.status in ({_placeholders(DONE_STATUSES)}) and o.created_at > ?", [*DONE_STATUSES, timestamp(watermark)])
+    return orders_frame(_completed_orders().gt("created_at", watermark).execute().data)
+
+
+@cached_reader("orders", "inventory")
+def get_orders_by_ids(order_ids):
+    # Lignes complètes pour une liste d'ids (résultats de recherche), les plus récentes d'abord
+    if not order_ids:
+        return orders_frame([])
+    if get_replica() is not None:
+        return _local_orders(f"o.id in ({_placeholders(order_ids)})", list(order_ids))
+    response = init_connection().table("orders")\
+        .select(ORDER_COLUMNS)\
+        .in_("id", list(order_ids))\
+        .order('created_at', desc=True)\
+        .order('id', desc=True)\
+        .execute()
+    return orders_frame(response.data)
+
+
+def get_orders_between(start, end):
+    # Commandes créées dans [start, end[ (timestamps ISO), avec les seules colonnes des agrégats
+    # journaliers. Paginé par clé (created_at, id) : PostgREST plafonne le nombre de lignes par réponse.
+    if get_replica() is not None:
+        return orders_frame(get_replica().query(
+            f"select {DAY_COLUMNS} from orders where created_at >= ? and created_at < ? order by created_at, id",
+            (timestamp(start), timestamp(end)), tables=("orders",),
+        ))
+    rows, cursor = [], None
+    while True:
+        query = init_connection().table("orders")\
+            .select(DAY_COLUMNS)\
+            .gte('created_at', start)\
+            .lt('created_at', end)\
+            .order('created_at')\
+            .order('id')
+        if cursor is not None:
+            created_at, order_id = cursor
+            query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{order_id})')
+        page = query.limit(KEYS_PAGE_SIZE).execute().data
+        rows.extend(page)
+        if len(page) < KEYS_PAGE_SIZE:
+            return orders_frame(rows)
+        cursor = (page[-1]['created_at'], page[-1]['id'])
+
+
+def get_inventory_after(after_id=None, limit=KEYS_PAGE_SIZE):
+    # Page suivante du catalogue par ordre de code (export en flux, sans tout charger d'un coup)
+    query = init_connection().table("inventory").select("*").order('id')
+    if after_id is not None:
+        query = query.gt('id', after_id)
+    return query.limit(limit).execute().data
+
+
+# Le journal du stock (sql/stock_ledger.sql) n'est écrit que par le trigger de "inventory" :
+# il change exactement quand l'inventaire change, ses lectures suivent donc le cache de l'inventaire.
+@cached_reader("inventory")
+def get_stock_movements(product_id, limit=MOVEMENTS_PAGE_SIZE):
+    # Derniers mouvements d'un SKU, du plus récent au plus ancien
+    response = init_connection().table("stock_movements")\
+        .select("*")\
+        .eq('product_id', product_id)\
+        .order('created_at', desc=True)\
+        .order('id', desc=True)\
+        .limit(limit)\
+        .execute()
+    return movements_frame(response.data)
+
+
+@cached_reader("inventory")
+def get_stock_at(at):
+    # Stock et prix d'achat de chaque SKU à l'instant at (ISO) : photo la plus proche + mouvements depuis
+    response = init_connection().rpc("stock_at", {"p_at": at}).execute()
+    return stock_frame(response.data)
+
+
+def get_order_keys_after(cursor=None, limit=KEYS_PAGE_SIZE):
+    # Colonnes minimales pour l'index de recherche, en ordre croissant (created_at, id).
+    # Pas de cache ici : c'est l'index lui-même qui garde ces lignes.
+    query = init_connection().table("orders")\
+        .select("id, created_at, customer_phone, order_ref, product_id")\
+        .order('created_at')\
+        .order('id')
+    if cursor is not None:
+        created_at, order_id = cursor
+        query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{order_id})')
+    return query.limit(limit).execute().data
+
+
+# --- ÉCRITURES ---
+def deliver_orders(order_ids):
+    # Valide (LIVRÉ) un lot de commandes en un seul appel : la RPC deliver_orders
+    # (sql/deliver_orders.sql) décrémente le stock et fige le coût dans une transaction.
+    # Renvoie [(order_id, succès, message)]
+    response = init_connection().rpc("deliver_orders", {"p_order_ids": [int(i) for i in order_ids]}).execute()
+    invalidate("inventory", "orders")
+    return [(r['order_id'], r['success'], r['message']) for r in response.data]
+
+
+def upsert_inventory(records, reason="ajustement", note=None):
+    # Crée ou met à jour un lot de produits en un seul aller-retour (conflit sur le code produit).
+    # La RPC import_inventory (sql/stock_ledger.sql) note les mouvements de stock avec ce motif ;
+    # en "reassort", quantity est la quantité à ajouter, appliquée au stock du moment.
+    # Renvoie {"written": n, "rejected": [{"id", "message"}]}.
+    response = init_connection().rpc("import_inventory", {"p_rows": records, "p_reason": reason, "p_note": note}).execute()
+    invalidate("inventory")
+    return response.data
+
+
+def cancel_orders(order_ids, status="Annulé (Client)"):
+    # Annulation groupée en une seule requête ; les commandes déjà terminées ne bougent pas
+    response = init_connection().table("orders")\
+        .update({"status": status})\
+        .in_("id", list(order_ids))\
+        .not_.in_("status", DONE_STATUSES)\
+        .execute()
+    invalidate("orders")
+    return len(response.data)
+
+
+def load_history(more=False):
+    # Historique paginé conservé en session : on ne recharge que les nouvelles lignes,
+    # et tout est repris de zéro si les commandes ont été modifiées depuis (invalidate)
+    state = st.session_state
+    if state.get("history_generation") != table_generation("orders"):
+        state.history_generation = table_generation("orders")
+        state.history = get_completed_orders_page()
+        state.history_exhausted = len(state.history) < HISTORY_PAGE_SIZE
+    elif not state.history.empty:
+        newer = get_completed_orders_since(state.history['created_at'].iloc[0].isoformat())
+        if not newer.empty:
+            state.history = cast_orders(pd.concat([newer, state.history], ignore_index=True))
+    else:
+        state.history = get_completed_orders_page()
+
+    if more and not state.history_exhausted and not state.history.empty:
+        last = state.history.iloc[-1]
+        page = get_completed_orders_page((last['created_at'].isoformat(), int(last['id'])))
+        state.history_exhausted = len(page) < HISTORY_PAGE_SIZE
+        state.history = cast_orders(pd.concat([state.history, page], ignore_index=True))
+    return state.history
@@ -0,0 +1,162 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# --- SERVICE DE DONNÉES PARTAGÉ (tout le processus) ---
+# Toutes les sessions passent par le même client Supabase. Une lecture identique à une autre
+# déjà en vol attend sa réponse au lieu de repartir (single-flight), et une réponse reste
+# servie quelques secondes à toutes les sessions. Les lectures qui échouent sur une erreur
+# passagère (réseau, 429, 5xx) sont relancées après une pause aléatoire croissante.
+# Une écriture (insert / update / upsert / delete, RPC d'écriture) part toujours directement,
+# sans reprise, et vide les réponses partagées.
+# Les réponses partagées sont en lecture seule : ne pas modifier response.data.
+
+SHARED_TTL = 2.0       # secondes pendant lesquelles une réponse est resservie
+RETRIES = 3            # reprises d'une lecture après une erreur passagère
+BACKOFF_BASE = 0.2     # secondes, doublé à chaque reprise (plafonné), tiré au hasard en dessous
+BACKOFF_CAP = 2.0
+MAX_SHARED = 256       # réponses gardées au plus
+
+# Chaque RPC appelée par l'app est déclarée ici. Lectures (fonctions stable, sans effet de bord) :
+# regroupées, partagées et reprises. Écritures : envoyées telles quelles. Une RPC non déclarée
+# est traitée comme une écriture (jamais resservie), avec un avertissement dans les logs.
+READ_RPCS = {"traffic_breakdown", "traffic_daily_visits", "stock_at", "product_daily_units", "search_orders"}
+WRITE_RPCS = {"deliver_orders", "import_inventory", "process_sale", "process_sales_once", "take_stock_snapshot"}
+WRITE_METHODS = {"insert", "update", "upsert", "delete"}
+TRANSIENT_CODES = {"429", "500", "502", "503", "504", "PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+
+
+def _transient(error):
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    return str(getattr(error, "code", "")) in TRANSIENT_CODES
+
+
+class _Request:
+    # Builder postgrest enveloppé : chaque appel chaîné est noté, la suite forme la clé de la requête
+    def __init__(self, service, builder, key, read):
+        self._service, self._builder, self._key, self._read = service, builder, key, read
+
+    def __getattr__(self, attr):
+        value = getattr(self._builder, attr)
+        read = self._read and attr not in WRITE_METHODS
+        if callable(value):
+            def call(*args, **kwargs):
+                result = value(*args, **kwargs)
+                if not hasattr(result, "execute"):
+                    return result
+                key = self._key + (repr((attr, args, sorted(kwargs.items()))),) if read else None
+                return _Request(self._service, result, key, read)
+            return call
+        if hasattr(value, "execute"):  # propriété chaînable (not_)
+            return _Request(self._service, value, self._key + (attr,) if read else None, read)
+        return value
+
+    def execute(self):
+        if not self._read:
+            return self._service.write(self._builder)
+        return self._service.read(self._builder, self._key)
+
+
+class DataService:
+    def __init__(self, client, ttl=SHARED_TTL):
+        self._client, self.ttl = client, ttl
+        self._lock = threading.Lock()
+        self._inflight = {}    # clé -> Future de la requête en cours
+        self._shared = {}      # clé -> (expiration, réponse)
+        self._generation = 0   # change à chaque écriture / invalidation
+        self._stats = dict.fromkeys(["demandées", "envoyées", "en_vol", "partagées", "reprises"], 0)
+
+    def _bump(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    # --- Interface du client supabase ---
+    def table(self, name):
+        return _Request(self, self._client.table(name), ("table", name), True)
+
+    from_ = table
+
+    def rpc(self, name, params=None, **kwargs):
+        builder = self._client.rpc(name, params or {}, **kwargs)
+        read = name in READ_RPCS
+        if not read and name not in WRITE_RPCS:
+            logger.warning("RPC %s non déclarée dans dataservice : traitée comme une écriture", name)
+        return _Request(self, builder, ("rpc", name, repr(sorted((params or {}).items()))) if read else None, read)
+
+    def __getattr__(self, attr):
+        return getattr(self._client, attr)
+
+    # --- Exécution ---
+    def forget(self):
+        # Après une écriture : plus aucune réponse partagée, et celles en vol ne seront pas gardées
+        with self._lock:
+            self._shared.clear()
+            self._generation += 1
+
+    def write(self, builder):
+        self._bump("demandées")
+        self._bump("envoyées")
+        try:
+            return builder.execute()
+        finally:
+            self.forget()
+
+    def read(self, builder, key):
+        now = time.monotonic()
+        with self._lock:
+            self._stats["demandées"] += 1
+            shared = self._shared.get(key)
+            if shared is not None and shared[0] > now:
+                self._stats["partagées"] += 1
+                return shared[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                generation = self._generation
+            else:
+                self._stats["en_vol"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            response = self._execute_with_retry(builder)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        with self._lock:
+            if generation == self._generation:
+                if len(self._shared) >= MAX_SHARED:
+                    now = time.monotonic()
+                    self._shared = {k: v for k, v in self._shared.items() if v[0] > now}
+                self._shared[key] = (time.monotonic() + self.ttl, response)
+        future.set_result(response)
+        return response
+
+    def _execute_with_retry(self, builder):
+        for attempt in range(RETRIES + 1):
+            self._bump("envoyées")
+            try:
+                return builder.execute()
+            except Exception as e:
+                if attempt == RETRIES or not _transient(e):
+                    raise
+                self._bump("reprises")
+                # "Full jitter" : les sessions qui échouent ensemble ne reviennent pas ensemble
+                time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["économisées"] = stats["en_vol"] + stats["partagées"]
+        return stats
@@ -0,0 +1,143 @@
+import contextlib
+import difflib
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+from search import normalize_text
+
+# --- CACHE DES RÉPONSES DE L'ANALYSTE ---
+# Le code généré par Gemini est gardé sur disque (SQLite), indexé par la question normalisée
+# et le schéma de la DataFrame. Une question déjà posée (ou presque identique) réutilise ce code
+# sur les données du jour, sans appel au modèle.
+
+DEFAULT_PATH = ".cache/analyst_cache.sqlite"
+MAX_ENTRIES = 500
+SIMILARITY = 0.88  # ratio difflib minimal pour une question "presque identique"
+
+# Mots qui ne changent pas le sens d'une question sur les données
+STOPWORDS = {
+    "le", "la", "les", "l", "un", "une", "des", "de", "du", "d", "est", "sont", "quel", "quelle",
+    "quels", "quelles", "moi", "me", "montre", "donne", "affiche", "stp", "svp", "s", "il", "te", "plait",
+}
+# Mots qui, eux, changent la réponse : deux questions proches qui n'en ont pas les mêmes
+# ("plus" / "moins", "pas", "sans"...) ne partagent pas leur code
+SENSE_WORDS = {"plus", "moins", "pas", "sans", "ne", "aucun", "aucune", "jamais", "sauf", "hors"}
+
+
+def normalize_question(question):
+    words = re.sub(r"[^a-z0-9]+", " ", normalize_text(question)).split()
+    return " ".join(w for w in words if w not in STOPWORDS)
+
+
+def _invariants(normalized):
+    # Nombres (années, top N, montants) et mots de comparaison / négation d'une question normalisée :
+    # le ratio difflib les noie dans le reste, ils doivent être identiques pour réutiliser un code
+    words = normalized.split()
+    return {w for w in words if w.isdigit()}, {w for w in words if w in SENSE_WORDS}
+
+
+def schema_signature(df):
+    # Même question sur des colonnes différentes = autre code : le schéma fait partie de la clé
+    schema = ",".join(f"{col}:{dtype}" for col, dtype in df.dtypes.items())
+    return hashlib.sha1(schema.encode()).hexdigest()[:16]
+
+
+class AnalystCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=MAX_ENTRIES, similarity=SIMILARITY):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("""
+                create table if not exists answers (
+                    key text primary key,
+                    schema text not null,
+                    normalized text not null,
+                    question text not null,
+                    code text not null,
+                    created_at real not null,
+                    last_used real not null,
+                    hits integer not null default 0
+                )
+            """)
+            db.execute("create index if not exists answers_lru on answers (last_used)")
+            db.execute("create index if not exists answers_schema on answers (schema)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _key(normalized, schema):
+        return hashlib.sha256(f"{schema}|{normalized}".encode()).hexdigest()
+
+    def get(self, question, schema):
+        # Renvoie (clé, code, question d'origine) ou None
+        normalized = normalize_question(question)
+        with self.lock, self._connect() as db:
+            row = db.execute(
+                "select key, code, question from answers where key = ?", (self._key(normalized, schema),)
+            ).fetchone()
+            if row is None:
+                # Question reformulée : la plus proche parmi celles du même schéma
+                best, best_ratio = None, self.similarity
+                invariants = _invariants(normalized)
+                for candidate in db.execute("select key, code, question, normalized from answers where schema = ?", (schema,)):
+                    if _invariants(candidate[3]) != invariants:
+                        continue
+                    ratio = difflib.SequenceMatcher(None, normalized, candidate[3]).ratio()
+                    if ratio >= best_ratio:
+                        best, best_ratio = candidate[:3], ratio
+                row = best
+            if row is None:
+                return None
+            db.execute("update answers set last_used = ?, hits = hits + 1 where key = ?", (time.time(), row[0]))
+            return row
+
+    def put(self, question, schema, code):
+        normalized = normalize_question(question)
+        key = self._key(normalized, schema)
+        now = time.time()
+        with self.lock, self._connect() as db:
+            db.execute(
+                "insert or replace into answers (key, schema, normalized, question, code, created_at, last_used, hits)"
+                " values (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, schema, normalized, question, code, now, now),
+            )
+            # Éviction LRU : on garde les max_entries réponses utilisées le plus récemment
+            db.execute(
+                "delete from answers where key not in (select key from answers order by last_used desc limit ?)",
+                (self.max_entries,),
+            )
+        return key
+
+    def discard(self, key):
+        # Code qui a échoué à l'exécution : on ne le resservira pas
+        with self.lock, self._connect() as db:
+            db.execute("delete from answers where key = ?", (key,))
+
+    def stats(self):
+        with self._connect() as db:
+            count, hits = db.execute("select count(*), coalesce(sum(hits), 0) from answers").fetchone()
+        return {"réponses": count, "réutilisations": hits}
+
+
+@st.cache_resource
+def get_analyst_cache():
+    config = st.secrets.get("analyst", {})
+    return AnalystCache(
+        config.get("cache_path", DEFAULT_PATH), config.get("cache_size", MAX_ENTRIES), config.get("similarity", SIMILARITY),
+    )
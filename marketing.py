@@ -0,0 +1,128 @@
+import asyncio
+import re
+import time
+import types
+
+import pandas as pd
+import streamlit as st
+
+# --- GÉNÉRATEUR DE SCRIPTS (CONTENT FACTORY) ---
+# Un script s'affiche au fil de l'eau (stream=True) au lieu d'attendre la réponse complète.
+# En mode série, les couples produit × angle partent en parallèle (asyncio, avec un plafond
+# d'appels simultanés) et les scripts sont rassemblés dans un tableau téléchargeable.
+
+MODEL_NAME = 'gemini-2.0-flash-lite-preview-02-05'
+CONCURRENCY = 4    # appels Gemini simultanés en mode série
+MAX_BATCH = 40     # scripts par série
+
+ANGLES = [
+    "😱 Le Choc (Hook visuel)",
+    "storytelling (Témoignage émouvant)",
+    "educational (Le saviez-vous ?)",
+    "humour (Ivoirien)"
+]
+
+
+def script_prompt(product, angle, context=""):
+    prompt = f"""
+                Agis comme un expert TikTok ivoirien pour la marque 'Sublime Haven'.
+                Produit : {product}
+                Angle : {angle}
+
+                Structure du script (30s) :
+                1. HOOK : Phrase choc.
+                2. BODY : Bénéfice produit (pas de jargon technique).
+                3. CTA : Appel à l'action.
+
+                Ton : Amical, direct, utilisation modérée de l'argot ivoirien (Nouchi léger).
+                Utilise des emojis.
+                """
+    if context:
+        prompt += f"\nIntègre cette tendance/info : {context}"
+    return prompt
+
+
+# --- MODÈLE LOCAL (tests, benchmark, démo sans clé) ---
+class StubModel:
+    # Même interface que genai.GenerativeModel pour ce qu'on en utilise : texte déterministe
+    # construit à partir du prompt, découpé en morceaux comme un vrai flux.
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    @staticmethod
+    def _script(prompt):
+        product = re.search(r"Produit : (.*)", prompt)
+        angle = re.search(r"Angle : (.*)", prompt)
+        product = product.group(1).strip() if product else "ce produit"
+        angle = angle.group(1).strip() if angle else ""
+        return (
+            f"**HOOK** : Tu connais {product} ? 😱\n\n"
+            f"**BODY** : ({angle}) Ta peau va te dire merci, c'est doux et ça dure. ✨\n\n"
+            f"**CTA** : Commande vite sur Sublime Haven, le stock part ! 🛍️"
+        )
+
+    def _chunks(self, prompt):
+        return re.findall(r"\S+\s*", self._script(prompt))
+
+    def generate_content(self, prompt, stream=False):
+        if not stream:
+            time.sleep(self.delay)
+            return types.SimpleNamespace(text=self._script(prompt))
+
+        def chunks():
+            for piece in self._chunks(prompt):
+                time.sleep(self.delay / 10)
+                yield types.SimpleNamespace(text=piece)
+        return chunks()
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(self.delay)
+        return types.SimpleNamespace(text=self._script(prompt))
+
+
+def get_script_model():
+    # [gemini] model = "stub" dans les secrets : aucun appel réseau
+    config = st.secrets.get("gemini", {})
+    if config.get("model") == "stub":
+        return StubModel(config.get("stub_delay", 0.0))
+    import google.generativeai as genai
+    return genai.GenerativeModel(config.get("model", MODEL_NAME))
+
+
+# --- UN SCRIPT, EN FLUX ---
+def stream_script(model, prompt):
+    # Générateur de morceaux de texte pour st.write_stream
+    for chunk in model.generate_content(prompt, stream=True):
+        try:
+            text = chunk.text
+        except ValueError:  # morceau sans texte (filtre de sécurité, fin de flux)
+            continue
+        if text:
+            yield text
+
+
+# --- PLUSIEURS SCRIPTS, EN PARALLÈLE ---
+async def _generate_all(model, jobs, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(product, angle, prompt):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await model.generate_content_async(prompt)
+                script, error = response.text, None
+            except Exception as e:  # une erreur n'arrête pas la série
+                script, error = None, f"{type(e).__name__} : {e}"
+            return {
+                "produit": product, "angle": angle, "script": script, "erreur": error,
+                "secondes": round(time.perf_counter() - start, 2),
+            }
+
+    return await asyncio.gather(*(one(*job) for job in jobs))
+
+
+def generate_batch(model, products, angles, context="", concurrency=CONCURRENCY):
+    # Tous les couples produit × angle -> DataFrame (une ligne par script, dans l'ordre demandé)
+    jobs = [(p, a, script_prompt(p, a, context)) for p in products for a in angles]
+    rows = asyncio.run(_generate_all(model, jobs, concurrency))
+    return pd.DataFrame(rows, columns=["produit", "angle", "script", "erreur", "secondes"])
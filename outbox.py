@@ -0,0 +1,211 @@
+import contextlib
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from data import init_connection, invalidate
+
+logger = logging.getLogger(__name__)
+
+# --- FILE D'ÉCRITURE LOCALE (WRITE-BEHIND) ---
+# Dépenses et ventes manuelles sont d'abord notées dans un fichier SQLite local : le formulaire
+# répond tout de suite, même sans réseau. Un thread les envoie ensuite à Supabase par lots,
+# avec des reprises espacées (backoff exponentiel) tant que le réseau ne répond pas.
+# Chaque écriture porte une clé d'idempotence : un lot renvoyé après une réponse perdue n'est
+# pas appliqué deux fois (voir sql/write_queue.sql).
+
+DB_PATH = ".cache/outbox.sqlite3"
+BATCH_SIZE = 50
+POLL = 5              # secondes entre deux passages quand rien ne presse
+BASE_DELAY = 2        # secondes avant la première reprise, doublé à chaque échec
+MAX_DELAY = 300
+MAX_ATTEMPTS = 8      # au-delà : "échec", à relancer à la main depuis la barre latérale
+
+SCHEMA = """
+create table if not exists outbox (
+  id integer primary key,
+  key text not null unique,
+  kind text not null,
+  payload text not null,
+  created_at real not null,
+  status text not null default 'pending',   -- pending / failed
+  attempts integer not null default 0,
+  next_try real not null default 0,
+  last_error text
+)
+"""
+
+
+# --- ENVOIS PAR TYPE ---
+# Chaque fonction reçoit [(clé, payload)] et renvoie {clé: message d'erreur ou None}.
+# Une exception (réseau, 5xx) = tout le lot est à reprendre plus tard.
+def _send_expenses(client, items):
+    rows = [{**payload, "idempotency_key": key} for key, payload in items]
+    client.table("cashflow").upsert(rows, on_conflict="idempotency_key", ignore_duplicates=True).execute()
+    invalidate("cashflow")
+    return {key: None for key, _ in items}
+
+
+def _send_sales(client, items):
+    sales = [{"key": key, **payload} for key, payload in items]
+    response = client.rpc("process_sales_once", {"p_sales": sales}).execute()
+    invalidate("inventory", "orders")
+    return {r["key"]: None if r["success"] else r["message"] for r in response.data}
+
+
+SENDERS = {
+    "expense": _send_expenses,
+    "sale": _send_sales,
+}
+KIND_LABELS = {"expense": "Dépense", "sale": "Vente manuelle"}
+
+
+class Outbox:
+    def __init__(self, path, client):
+        self.path, self.client = path, client
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        with self._connect() as db:
+            db.execute("pragma journal_mode=wal")
+            db.execute(SCHEMA)
+        self.thread = threading.Thread(target=self._loop, name="outbox", daemon=True)
+        self.thread.start()
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Une connexion par opération (commit à la sortie) : le thread d'envoi et ceux des
+        # sessions n'en partagent aucune
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # --- Côté formulaires ---
+    def enqueue(self, kind, payload):
+        # Note l'écriture (commit sur disque) puis réveille le thread d'envoi ; renvoie sa clé
+        key = str(uuid.uuid4())
+        with self._connect() as db:
+            db.execute(
+                "insert into outbox (key, kind, payload, created_at) values (?, ?, ?, ?)",
+                (key, kind, json.dumps(payload), time.time()),
+            )
+        self.wake.set()
+        return key
+
+    def counts(self):
+        with self._connect() as db:
+            rows = db.execute("select status, count(*) from outbox group by status").fetchall()
+        return {"pending": 0, "failed": 0, **dict(rows)}
+
+    def failed(self):
+        with self._connect() as db:
+            rows = db.execute(
+                "select key, kind, payload, created_at, attempts, last_error from outbox where status = 'failed' order by id"
+            ).fetchall()
+        df = pd.DataFrame(rows, columns=["key", "kind", "payload", "created_at", "attempts", "last_error"])
+        df["created_at"] = pd.to_datetime(df["created_at"], unit="s", utc=True)
+        return df
+
+    def retry(self, keys=None):
+        # Remet des échecs (tous par défaut) dans la file, avec un compteur de tentatives à zéro
+        with self._connect() as db:
+            query = "update outbox set status = 'pending', attempts = 0, next_try = 0 where status = 'failed'"
+            if keys is None:
+                db.execute(query)
+            else:
+                db.executemany(query + " and key = ?", [(k,) for k in keys])
+        self.wake.set()
+
+    def discard(self, keys):
+        with self._connect() as db:
+            db.executemany("delete from outbox where key = ? and status = 'failed'", [(k,) for k in keys])
+
+    # --- Côté thread d'envoi ---
+    def _loop(self):
+        while True:
+            self.wake.wait(POLL)
+            self.wake.clear()
+            try:
+                while self.flush():
+                    pass
+            except Exception:
+                logger.exception("outbox : passage interrompu")
+
+    def flush(self):
+        # Envoie un lot d'écritures dues (un seul type à la fois) ; renvoie le nombre traité
+        with self.lock, self._connect() as db:
+            first = db.execute(
+                "select kind from outbox where status = 'pending' and next_try <= ? order by id limit 1", (time.time(),)
+            ).fetchone()
+            if first is None:
+                return 0
+            rows = db.execute(
+                "select key, payload, attempts from outbox where status = 'pending' and kind = ? and next_try <= ? "
+                "order by id limit ?", (first[0], time.time(), BATCH_SIZE),
+            ).fetchall()
+            items = [(key, json.loads(payload)) for key, payload, _ in rows]
+            try:
+                results = SENDERS[first[0]](self.client, items)
+            except Exception as e:
+                # Réseau ou serveur : on réessaie plus tard (délai doublé, un peu de hasard pour
+                # ne pas renvoyer tous les lots au même instant)
+                logger.warning("outbox : envoi de %d %s impossible (%s)", len(rows), first[0], e)
+                for key, _, attempts in rows:
+                    delay = min(MAX_DELAY, BASE_DELAY * 2 ** attempts) * random.uniform(0.8, 1.2)
+                    status = "failed" if attempts + 1 >= MAX_ATTEMPTS else "pending"
+                    db.execute(
+                        "update outbox set attempts = attempts + 1, next_try = ?, status = ?, last_error = ? where key = ?",
+                        (time.time() + delay, status, f"{type(e).__name__} : {e}", key),
+                    )
+                return 0
+            for key, _, _ in rows:
+                error = results.get(key, "sans réponse du serveur")
+                if error is None:
+                    db.execute("delete from outbox where key = ?", (key,))
+                else:
+                    # Refus métier (stock insuffisant...) : inutile de réessayer tel quel
+                    db.execute("update outbox set status = 'failed', attempts = attempts + 1, last_error = ? where key = ?", (error, key))
+            return len(rows)
+
+
+@st.cache_resource
+def get_outbox():
+    config = st.secrets.get("outbox", {})
+    return Outbox(config.get("path", DB_PATH), init_connection())
+
+
+# --- INDICATEUR (barre latérale) ---
+@st.fragment(run_every=POLL)
+def render_status():
+    outbox = get_outbox()
+    counts = outbox.counts()
+    if not counts["pending"] and not counts["failed"]:
+        st.caption("☁️ Tout est synchronisé")
+        return
+    if counts["pending"]:
+        st.caption(f"⏳ {counts['pending']} écriture(s) en attente d'envoi")
+    if counts["failed"]:
+        with st.expander(f"⚠️ {counts['failed']} écriture(s) en échec"):
+            failed = outbox.failed()
+            for row in failed.itertuples():
+                payload = json.loads(row.payload)
+                st.caption(f"**{KIND_LABELS.get(row.kind, row.kind)}** du {row.created_at:%d/%m %H:%M} — {row.last_error}")
+                st.json(payload, expanded=False)
+            c_retry, c_drop = st.columns(2)
+            if c_retry.button("🔁 Réessayer", key="outbox_retry"):
+                outbox.retry()
+                st.rerun(scope="fragment")
+            if c_drop.button("🗑️ Abandonner", key="outbox_discard"):
+                outbox.discard(failed["key"].tolist())
+                st.rerun(scope="fragment")
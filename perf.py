@@ -0,0 +1,145 @@
+import collections
+import contextlib
+import json
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# --- INSTRUMENTATION ---
+# Chaque appel Supabase (.execute() d'une requête ou d'une RPC) et chaque section de page
+# est chronométré et rattaché au passage (rerun) en cours de la session.
+# Le panneau de debug s'affiche avec ?debug=1 dans l'URL.
+
+HISTORY_SIZE = 5000  # nombre de mesures gardées pour l'export
+
+_lock = threading.Lock()
+_runs = {}  # session_id -> passage en cours
+_history = collections.deque(maxlen=HISTORY_SIZE)
+
+
+def _session_id():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def _detail():
+    # Taille des réponses : mesurée seulement pour un passage affiché avec ?debug=1
+    run = _runs.get(_session_id())
+    return run is not None and run["detail"]
+
+
+def record(kind, name, ms, rows=None, size=None):
+    run = _runs.get(_session_id())
+    if run is None:
+        return
+    with _lock:
+        run["records"].append({"type": kind, "nom": name, "ms": round(ms, 1), "lignes": rows, "octets": size})
+
+
+@contextlib.contextmanager
+def span(name):
+    # with span("KPIs"): ... -> temps passé dans une section de page
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record("section", name, (time.perf_counter() - start) * 1000)
+
+
+class _TimedQuery:
+    # Enveloppe un builder postgrest : les appels chaînés passent, execute() est mesuré
+    def __init__(self, builder, name):
+        self._builder = builder
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._builder, attr)
+        name = f"{self._name}.{attr}" if attr in ("select", "insert", "update", "upsert", "delete") else self._name
+        if callable(value):
+            def call(*args, **kwargs):
+                result = value(*args, **kwargs)
+                return _TimedQuery(result, name) if hasattr(result, "execute") else result
+            return call
+        return _TimedQuery(value, name) if hasattr(value, "execute") else value
+
+    def execute(self):
+        start = time.perf_counter()
+        response = self._builder.execute()
+        data = response.data
+        rows = len(data) if isinstance(data, list) else None
+        size = len(json.dumps(data, default=str)) if _detail() else None
+        record("supabase", self._name, (time.perf_counter() - start) * 1000, rows, size)
+        return response
+
+
+class InstrumentedClient:
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return _TimedQuery(self._client.table(name), name)
+
+    def rpc(self, name, params=None, **kwargs):
+        return _TimedQuery(self._client.rpc(name, params or {}, **kwargs), f"rpc:{name}")
+
+    def __getattr__(self, attr):
+        return getattr(self._client, attr)
+
+
+def _archive(session_id):
+    run = _runs.pop(session_id, None)
+    if run is None:
+        return
+    total = (time.perf_counter() - run["start"]) * 1000
+    with _lock:
+        for rec in run["records"] + [{"type": "passage", "nom": "total", "ms": round(total, 1), "lignes": None, "octets": None}]:
+            _history.append({"horodatage": run["at"], "passage": run["id"], "page": run["page"], **rec})
+
+
+def begin_run(page):
+    # À appeler en haut du script : clôt le passage précédent s'il a été interrompu (st.rerun)
+    session_id = _session_id()
+    _archive(session_id)
+    _runs[session_id] = {
+        "id": f"{str(session_id)[:8]}-{time.time_ns() % 10**8}",
+        "page": page,
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "start": time.perf_counter(),
+        "detail": st.query_params.get("debug") == "1",
+        "records": [],
+    }
+
+
+def history_frame():
+    with _lock:
+        return pd.DataFrame(list(_history))
+
+
+def render_panel():
+    # À appeler en bas du script : affiche le détail du passage courant puis l'archive
+    session_id = _session_id()
+    run = _runs.get(session_id)
+    if st.query_params.get("debug") != "1" or run is None:
+        _archive(session_id)
+        return
+    total = (time.perf_counter() - run["start"]) * 1000
+    df = pd.DataFrame(run["records"], columns=["type", "nom", "ms", "lignes", "octets"])
+    _archive(session_id)
+
+    with st.sidebar.expander("🐞 Performance", expanded=True):
+        st.metric("Passage complet", f"{total:.0f} ms")
+        by_kind = df.groupby("type")["ms"].sum() if not df.empty else pd.Series(dtype=float)
+        c1, c2 = st.columns(2)
+        c1.metric("Supabase", f"{by_kind.get('supabase', 0):.0f} ms")
+        c2.metric("Sections", f"{by_kind.get('section', 0):.0f} ms")
+        st.dataframe(df, hide_index=True, use_container_width=True)
+
+        history = history_frame()
+        st.caption(f"Historique : {history['passage'].nunique() if not history.empty else 0} passage(s)")
+        c1, c2 = st.columns(2)
+        c1.download_button("CSV", history.to_csv(index=False), "perf_history.csv", "text/csv")
+        c2.download_button("JSON", history.to_json(orient="records", force_ascii=False), "perf_history.json", "application/json")
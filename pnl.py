@@ -0,0 +1,67 @@
+from datetime import date
+
+import pandas as pd
+
+from data import get_monthly_sales, get_monthly_expenses
+
+# --- COMPTE DE RÉSULTAT (page Rentabilité) ---
+# Marge brute = CA des commandes livrées - coût d'achat figé à la livraison (unit_buy_cost_at_sale),
+# résultat net = marge brute - dépenses (cashflow SORTIE). Tout part des agrégats mensuels
+# (sql/pnl_rollups.sql) : la page ne dépend pas du nombre de commandes.
+
+SALES_TOTALS = ["commandes", "unites", "ca", "cout_achat", "unites_sans_cout"]
+SALES_NAMES = {
+    "orders": "commandes", "units": "unites", "revenue": "ca", "cost": "cout_achat",
+    "units_without_cost": "unites_sans_cout", "product_id": "produit",
+}
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def months_between(start, end):
+    # Premiers du mois de start à end (inclus)
+    return list(pd.date_range(month_start(start), month_start(end), freq="MS").date)
+
+
+def _with_margin(df):
+    df["marge_brute"] = df["ca"] - df["cout_achat"]
+    df["taux_marge"] = (df["marge_brute"] / df["ca"].where(df["ca"] > 0) * 100).round(1)
+    return df
+
+
+def margin_by(sales, key):
+    # Marge brute par produit ou par source, triée de la plus forte à la plus faible
+    if sales.empty:
+        return _with_margin(pd.DataFrame(columns=[key, *SALES_TOTALS], dtype="int64")).set_index(key)
+    grouped = sales.groupby(key)[SALES_TOTALS].sum()
+    return _with_margin(grouped).sort_values("marge_brute", ascending=False)
+
+
+def profit_and_loss(start, end):
+    # Compte de résultat des mois de start à end (dates quelconques, ramenées au mois) :
+    #   "mois"     : DataFrame par mois (ca, cout_achat, marge_brute, taux_marge, depenses, resultat_net...)
+    #   "produits" : marge par produit ; "sources" : marge par source
+    #   "depenses" : DataFrame mois x catégorie de dépense
+    months = months_between(start, end)
+    sales = get_monthly_sales(months[0], months[-1]).rename(columns=SALES_NAMES)
+    expenses = get_monthly_expenses(months[0], months[-1])
+
+    monthly = sales.groupby("month")[SALES_TOTALS].sum().reindex(months, fill_value=0)
+    monthly = _with_margin(monthly.rename_axis("mois"))
+    by_category = expenses.pivot_table(index="month", columns="category", values="amount", aggfunc="sum", fill_value=0)\
+        .reindex(months, fill_value=0).rename_axis(index="mois", columns="catégorie")
+    monthly["depenses"] = by_category.sum(axis=1).astype("int64")
+    monthly["resultat_net"] = monthly["marge_brute"] - monthly["depenses"]
+    return {
+        "mois": monthly,
+        "produits": margin_by(sales, "produit"),
+        "sources": margin_by(sales, "source"),
+        "depenses": by_category,
+    }
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data import get_daily_units, get_inventory
+from daily_stats import utc_today
+
+# --- RÉAPPROVISIONNEMENT (page Stocks) ---
+# Pour chaque produit, en un seul passage vectorisé sur la matrice jours x produits de la demande
+# (sql/replenishment.sql) : vitesses de vente sur fenêtres glissantes, prévision journalière par
+# lissage exponentiel, dispersion de la demande, puis couverture, stock de sécurité, point de
+# commande et quantité à commander au vu du stock actuel.
+# L'historique s'arrête à hier : la prévision est calculée une fois par jour et par processus,
+# seul le rapprochement avec le stock (quelques opérations par colonne) est refait à chaque passage.
+
+HISTORY_DAYS = 365
+WINDOWS = (7, 28, 90)      # fenêtres glissantes des vitesses de vente (jours)
+HALFLIFE = 14              # demi-vie du lissage exponentiel (jours)
+SIGMA_WINDOW = 28          # jours pour l'écart-type de la demande journalière
+LEAD_TIME = 7              # délai fournisseur par défaut (jours)
+REVIEW_PERIOD = 7          # une commande par semaine : le stock doit tenir jusqu'à la suivante
+SERVICE_LEVELS = {"90 %": 1.28, "95 %": 1.65, "98 %": 2.05, "99 %": 2.33}
+
+STATUS_ORDER = ["Rupture", "À commander", "OK", "Sans ventes"]
+
+
+def _smooth(units, halflife):
+    # Dernier niveau du lissage exponentiel de chaque colonne (récurrence s = a*x + (1-a)*s),
+    # écrit comme une moyenne pondérée : un seul produit matriciel pour tous les produits
+    alpha = 1 - 0.5 ** (1 / halflife)
+    weights = alpha * (1 - alpha) ** np.arange(len(units) - 1, -1, -1)
+    weights[0] = (1 - alpha) ** (len(units) - 1)  # le premier jour porte tout le poids restant
+    return weights @ units
+
+
+def demand_profile(units):
+    # units : DataFrame jours x produits -> DataFrame par produit (vente_7j..., prevision, ecart_type)
+    matrix = units.to_numpy(dtype="float64")
+    profile = {f"vente_{w}j": matrix[-w:].sum(axis=0) / min(w, len(matrix)) for w in WINDOWS}
+    profile["prevision"] = _smooth(matrix, HALFLIFE) if len(matrix) else np.zeros(matrix.shape[1])
+    profile["ecart_type"] = matrix[-SIGMA_WINDOW:].std(axis=0, ddof=1) if len(matrix) > 1 else np.zeros(matrix.shape[1])
+    return pd.DataFrame(profile, index=units.columns.astype(str)).rename_axis("id")
+
+
+@st.cache_data(ttl=timedelta(days=1), max_entries=2, show_spinner=False)
+def daily_demand(day):
+    # Profil de demande calculé sur les HISTORY_DAYS jours complets avant `day` (gardé pour la journée)
+    units = get_daily_units(day - timedelta(days=HISTORY_DAYS), day - timedelta(days=1))
+    return demand_profile(units)
+
+
+def replenishment_plan(lead_time=LEAD_TIME, service_level="95 %", review=REVIEW_PERIOD):
+    # Un produit par ligne, les plus urgents d'abord :
+    #   jours_couverture = stock / prévision ; stock_securite = z * écart-type * racine(délai)
+    #   point_commande = prévision * délai + stock_securite
+    #   a_commander = ce qu'il faut pour tenir délai + période de revue, moins le stock
+    today = utc_today()
+    inventory = get_inventory()
+    if inventory.empty:
+        return pd.DataFrame(columns=["id", "product_name", "quantity", "statut"])
+    stock = inventory.set_index(inventory["id"].astype(str))[["product_name", "quantity"]]
+    plan = stock.join(daily_demand(today), how="left").fillna({c: 0.0 for c in ["prevision", "ecart_type"]})
+    plan[[f"vente_{w}j" for w in WINDOWS]] = plan[[f"vente_{w}j" for w in WINDOWS]].fillna(0.0)
+
+    quantity = plan["quantity"].to_numpy(dtype="float64")
+    forecast = plan["prevision"].to_numpy()
+    safety = SERVICE_LEVELS[service_level] * plan["ecart_type"].to_numpy() * np.sqrt(lead_time)
+    reorder_point = forecast * lead_time + safety
+    target = forecast * (lead_time + review) + safety
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(forecast > 0, np.maximum(quantity, 0) / forecast, np.nan)
+
+    plan["jours_couverture"] = np.round(cover, 1)
+    plan["rupture_le"] = pd.to_datetime(today) + pd.to_timedelta(np.floor(cover), unit="D")
+    plan["stock_securite"] = np.ceil(safety).astype("int64")
+    plan["point_commande"] = np.ceil(reorder_point).astype("int64")
+    plan["a_commander"] = np.ceil(np.maximum(target - quantity, 0)).astype("int64")
+    plan["statut"] = pd.Categorical(
+        np.select(
+            [forecast <= 0, quantity <= 0, quantity <= reorder_point],
+            ["Sans ventes", "Rupture", "À commander"],
+            "OK",
+        ),
+        categories=STATUS_ORDER, ordered=True,
+    )
+    plan.loc[plan["statut"] == "Sans ventes", "a_commander"] = 0
+    plan["prevision"] = plan["prevision"].round(2)
+    plan["ecart_type"] = plan["ecart_type"].round(2)
+    for w in WINDOWS:
+        plan[f"vente_{w}j"] = plan[f"vente_{w}j"].round(2)
+    return plan.reset_index().sort_values(["statut", "jours_couverture"], na_position="last", ignore_index=True)
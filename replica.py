@@ -0,0 +1,219 @@
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# --- RÉPLIQUE LOCALE (SQLite) ---
+# Copie locale de orders, inventory, site_traffic et cashflow, tenue à jour par filigrane :
+# à chaque synchronisation, seules les lignes modifiées depuis la précédente (updated_at, ou
+# created_at pour le trafic qui ne change jamais) et les suppressions notées par trigger
+# (replica_deletions) sont demandées à Supabase. Voir sql/replica_sync.sql.
+# Les lectures de data.py deviennent des requêtes SQL locales (filtres, group by) : seul le
+# résultat passe dans pandas. Chaque colonne Supabase est une vraie colonne SQLite (ajoutée
+# à la volée si une nouvelle apparaît) : pas de JSON à décoder à la lecture.
+
+SYNC_EVERY = 15       # secondes : âge maximum de la copie d'une table avant une lecture
+SYNC_PAGE = 1000      # lignes par requête de synchronisation (plafond PostgREST)
+OVERLAP = 60          # secondes relues avant le filigrane (transactions validées en retard)
+SCHEMA_VERSION = 1    # 1 : horodatages stockés au format canonique
+
+# Table -> colonne du filigrane + colonnes connues d'avance (typées, indexables)
+TABLES = {
+    "inventory": {
+        "watermark": "updated_at",
+        "columns": {"product_name": "text", "quantity": "integer", "buy_price_cfa": "integer", "sell_price_cfa": "integer"},
+    },
+    "orders": {
+        "watermark": "updated_at",
+        "columns": {
+            "created_at": "text", "status": "text", "product_id": "text", "quantity_sold": "integer",
+            "total_amount_cfa": "integer", "marketing_source": "text", "unit_buy_cost_at_sale": "integer",
+        },
+        "indexes": ["created_at", "status"],
+    },
+    "site_traffic": {
+        "watermark": "created_at",
+        "columns": {"created_at": "text", "source": "text", "device_type": "text", "os": "text"},
+        "indexes": ["created_at"],
+    },
+    "cashflow": {
+        "watermark": "updated_at",
+        "columns": {"date": "text", "type": "text", "category": "text", "amount_cfa": "integer"},
+        "indexes": ["date"],
+    },
+}
+
+
+def _schema(table, spec):
+    columns = "".join(f", {name} {kind}" for name, kind in spec["columns"].items())
+    statements = [f"create table if not exists {table} (id primary key{columns})"]
+    statements += [f"create index if not exists {table}_{col} on {table} ({col})" for col in spec.get("indexes", [])]
+    return statements
+
+
+# Horodatages gardés dans un seul format, de largeur fixe (UTC, microsecondes) : comparés en
+# texte par SQLite, ils doivent trier comme des instants. Postgres rogne les fractions
+# (…00.12+00:00) alors que pandas les complète (…00.120000+00:00) : toute valeur comparée
+# à ces colonnes (curseurs, filigranes, bornes) passe aussi par timestamp().
+TIMESTAMP_COLUMNS = {"created_at", "updated_at"}
+
+
+def timestamp(value):
+    if value is None:
+        return None
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+def _value(value):
+    # Valeurs JSON imbriquées (rares) gardées en texte
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def _earlier(timestamp, seconds):
+    return (datetime.fromisoformat(timestamp) - timedelta(seconds=seconds)).isoformat()
+
+
+class Replica:
+    def __init__(self, path, client, sync_every=SYNC_EVERY):
+        self.path, self.client, self.sync_every = path, client, sync_every
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.locks = {table: threading.Lock() for table in TABLES}
+        self.synced_at = dict.fromkeys(TABLES, 0.0)   # horloge monotone du dernier passage
+        self.pulled = dict.fromkeys(TABLES, 0)         # lignes reçues depuis le démarrage
+        with self.connect() as db:
+            db.execute("pragma journal_mode=wal")
+            db.execute("create table if not exists sync_state (name text primary key, watermark text, deletion_id integer not null default 0)")
+            for table, spec in TABLES.items():
+                for statement in _schema(table, spec):
+                    db.execute(statement)
+            self.columns = {t: {r[1] for r in db.execute(f"pragma table_info({t})")} for t in TABLES}
+            if db.execute("pragma user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Copie créée avant le format canonique : horodatages réécrits une fois
+                for table, columns in self.columns.items():
+                    for column in TIMESTAMP_COLUMNS & columns:
+                        rows = db.execute(f"select id, {column} from {table} where {column} is not null").fetchall()
+                        db.executemany(f"update {table} set {column} = ? where id = ?",
+                                       [(timestamp(value), row_id) for row_id, value in rows])
+                db.execute(f"pragma user_version = {SCHEMA_VERSION}")
+
+    @contextlib.contextmanager
+    def connect(self):
+        # Une connexion par opération (commit à la sortie) : threads de fetch_parallel et de
+        # sessions n'en partagent aucune ; le mode WAL laisse lire pendant une synchronisation
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # --- Synchronisation ---
+    def mark_stale(self, *tables):
+        # Après une écriture de l'app : la prochaine lecture resynchronise sans attendre
+        for table in tables:
+            if table in self.synced_at:
+                self.synced_at[table] = 0.0
+
+    def ensure_fresh(self, *tables):
+        for table in tables:
+            if time.monotonic() - self.synced_at[table] < self.sync_every:
+                continue
+            with self.locks[table]:
+                # Une seule synchronisation à la fois par table : les autres lecteurs attendent
+                # puis profitent de celle qui vient de se terminer
+                if time.monotonic() - self.synced_at[table] >= self.sync_every:
+                    self.sync(table)
+
+    def sync(self, table):
+        column = TABLES[table]["watermark"]
+        with self.connect() as db:
+            state = db.execute("select watermark, deletion_id from sync_state where name = ?", (table,)).fetchone()
+        watermark, deletion_id = state or (None, 0)
+        started = time.monotonic()
+
+        since = _earlier(watermark, OVERLAP) if watermark else None
+        cursor, pulled = None, 0
+        while True:
+            query = self.client.table(table).select("*").order(column).order('id')
+            if since is not None:
+                query = query.gte(column, since)
+            if cursor is not None:
+                value, row_id = cursor
+                query = query.or_(f'{column}.gt."{value}",and({column}.eq."{value}",id.gt.{json.dumps(row_id)})')
+            page = query.limit(SYNC_PAGE).execute().data
+            if page:
+                self._write(table, page)
+                pulled += len(page)
+                newest = page[-1][column]
+                watermark = max(watermark or newest, newest)
+                cursor = (newest, page[-1]["id"])
+            if len(page) < SYNC_PAGE:
+                break
+
+        deletions = self.client.table("replica_deletions")\
+            .select("id, row_key")\
+            .eq('table_name', table)\
+            .gt('id', deletion_id)\
+            .order('id')\
+            .execute().data
+        with self.connect() as db:
+            if deletions:
+                # row_key est du texte : on essaie aussi sa valeur entière (ids numériques)
+                keys = [(k, int(k) if k.lstrip("-").isdigit() else k) for k in (d["row_key"] for d in deletions)]
+                db.executemany(f"delete from {table} where id = ? or id = ?", keys)
+                deletion_id = deletions[-1]["id"]
+            db.execute(
+                "insert or replace into sync_state (name, watermark, deletion_id) values (?, ?, ?)",
+                (table, watermark, deletion_id),
+            )
+        self.synced_at[table] = time.monotonic()
+        self.pulled[table] += pulled
+        logger.info("replica %s : %d ligne(s), %d suppression(s) en %.0f ms",
+                    table, pulled, len(deletions), (time.monotonic() - started) * 1000)
+
+    def _write(self, table, rows):
+        names = sorted({name for row in rows for name in row})
+        with self.connect() as db:
+            for name in names:
+                if name not in self.columns[table]:
+                    # Colonne apparue côté Supabase : ajoutée telle quelle (sans type)
+                    db.execute(f'alter table {table} add column "{name}"')
+                    self.columns[table].add(name)
+            columns = ", ".join(f'"{name}"' for name in names)
+            db.executemany(
+                f"insert or replace into {table} ({columns}) values ({', '.join('?' * len(names))})",
+                [[timestamp(row.get(name)) if name in TIMESTAMP_COLUMNS else _value(row.get(name)) for name in names]
+                 for row in rows],
+            )
+
+    # --- Lectures ---
+    def query(self, sql, params=(), tables=()):
+        # Requête SQL sur la copie locale (synchronisée si besoin) -> DataFrame
+        self.ensure_fresh(*tables)
+        with self.connect() as db:
+            return pd.read_sql_query(sql, db, params=params)
+
+    def status(self):
+        with self.connect() as db:
+            state = dict(db.execute("select name, watermark from sync_state").fetchall())
+            counts = {t: db.execute(f"select count(*) from {t}").fetchone()[0] for t in TABLES}
+        now = time.monotonic()
+        return pd.DataFrame([
+            {
+                "table": t, "lignes": counts[t], "filigrane": state.get(t),
+                "reçues": self.pulled[t],
+                "âge_s": round(now - self.synced_at[t]) if self.synced_at[t] else None,
+            }
+            for t in TABLES
+        ])
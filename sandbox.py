@@ -0,0 +1,208 @@
+import multiprocessing
+import signal
+import sys
+import threading
+import types
+from multiprocessing import shared_memory
+from multiprocessing.context import SpawnContext, SpawnProcess
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+try:
+    import resource
+except ImportError:  # Windows : pas de limite mémoire par processus
+    resource = None
+
+# --- EXÉCUTION ISOLÉE DU CODE GÉNÉRÉ ---
+# Le code écrit par Gemini ne tourne plus dans le thread Streamlit : il part dans un pool de
+# processus démarrés à l'avance, avec une limite de temps et de mémoire. La DataFrame est
+# transmise en Arrow IPC via une mémoire partagée (pas de pickle), et les sorties reviennent
+# sous forme de liste d'appels st.* à rejouer (textes, tables, figures Plotly en JSON).
+
+WORKERS = 2
+TIMEOUT = 20       # secondes
+MEMORY_MB = 1024   # par processus
+GRACE = 5          # secondes de plus avant de tuer le pool si le processus ne répond plus
+
+# Appels st.* que la page accepte de rejouer (le reste est ignoré : pas de st.rerun, st.secrets...)
+REPLAYABLE = {
+    "write", "markdown", "text", "caption", "title", "header", "subheader", "code", "json", "divider",
+    "metric", "dataframe", "table", "plotly_chart", "bar_chart", "line_chart", "area_chart",
+    "info", "success", "warning", "error",
+}
+
+
+class AnalysisError(Exception):
+    pass
+
+
+# --- CÔTÉ PROCESSUS DE TRAVAIL ---
+def _init_worker(memory_mb):
+    # Imports lourds faits une fois au démarrage du processus, avant la limite mémoire
+    import plotly.express  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+class _Recorder:
+    # Remplace "st" dans le code généré : chaque appel est noté pour être rejoué par la page.
+    # Colonnes, onglets et conteneurs sont aplatis : leurs contenus s'affichent à la suite.
+    def __init__(self):
+        self.outputs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, labels):
+        return [self] * len(labels)
+
+    def container(self, *args, **kwargs):
+        return self
+
+    expander = container
+
+    def __getattr__(self, method):
+        def record(*args, **kwargs):
+            self.outputs.append((method, [_portable(a) for a in args], {k: _portable(v) for k, v in kwargs.items()}))
+        return record
+
+
+def _portable(value):
+    if hasattr(value, "to_plotly_json"):
+        return ("plotly", value.to_json())
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", value.to_frame() if isinstance(value, pd.Series) else value)
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    return str(value)
+
+
+def _on_alarm(signum, frame):
+    raise TimeoutError
+
+
+def _run(code, shm_name, size, timeout):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    recorder = _Recorder()
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.alarm(timeout)
+    try:
+        df = pa.ipc.open_stream(pa.py_buffer(shm.buf[:size])).read_all().to_pandas()
+        exec(code, {"df": df, "pd": pd, "px": px, "go": go, "st": recorder})
+        return "ok", recorder.outputs
+    except TimeoutError:
+        return "timeout", f"plus de {timeout} s"
+    except MemoryError:
+        return "error", "mémoire insuffisante pour cette analyse"
+    except Exception as e:
+        return "error", f"{type(e).__name__} : {e}"
+    finally:
+        signal.alarm(0)
+        df = None
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+# --- CÔTÉ STREAMLIT ---
+_MAIN_LOCK = threading.Lock()
+
+
+class _WorkerProcess(SpawnProcess):
+    # Sous Streamlit, __main__ est le script de la page : "spawn" le ré-exécuterait dans chaque
+    # processus. On le masque le temps du lancement (y compris les remplacements faits par le pool).
+    def start(self):
+        with _MAIN_LOCK:
+            main = sys.modules["__main__"]
+            sys.modules["__main__"] = types.ModuleType("__main__")
+            try:
+                super().start()
+            finally:
+                sys.modules["__main__"] = main
+
+
+class _WorkerContext(SpawnContext):
+    # "spawn" : un fork du serveur Streamlit (multi-thread) n'est pas sûr
+    Process = _WorkerProcess
+
+
+class AnalysisPool:
+    def __init__(self, workers=WORKERS, timeout=TIMEOUT, memory_mb=MEMORY_MB):
+        self.workers, self.timeout, self.memory_mb = workers, timeout, memory_mb
+        self.lock = threading.Lock()
+        self.pool = self._start()
+
+    def _start(self):
+        return _WorkerContext().Pool(self.workers, initializer=_init_worker, initargs=(self.memory_mb,), maxtasksperchild=100)
+
+    def _restart(self):
+        with self.lock:
+            self.pool.terminate()
+            self.pool = self._start()
+
+    def run(self, code, df):
+        # Exécute le code sur df dans un processus isolé ; renvoie la liste des sorties st.*
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        payload = sink.getvalue()
+        shm = shared_memory.SharedMemory(create=True, size=max(payload.size, 1))
+        try:
+            shm.buf[:payload.size] = payload.to_pybytes()
+            job = self.pool.apply_async(_run, (code, shm.name, payload.size, self.timeout))
+            try:
+                status, result = job.get(self.timeout + GRACE)
+            except multiprocessing.TimeoutError:
+                # Bloqué hors de portée de l'alarme (code natif) : on remplace tout le pool
+                self._restart()
+                raise AnalysisError(f"Analyse interrompue : plus de {self.timeout} s")
+        finally:
+            shm.close()
+            shm.unlink()
+        if status == "timeout":
+            raise AnalysisError(f"Analyse interrompue : {result}")
+        if status == "error":
+            raise AnalysisError(result)
+        return result
+
+
+@st.cache_resource
+def get_analysis_pool():
+    config = st.secrets.get("analyst", {})
+    return AnalysisPool(
+        config.get("workers", WORKERS),
+        config.get("timeout", TIMEOUT),
+        config.get("memory_mb", MEMORY_MB),
+    )
+
+
+def render_outputs(outputs):
+    # Rejoue dans la page les appels st.* faits par le code généré
+    import plotly.io as pio
+
+    def restore(value):
+        if isinstance(value, tuple) and value[0] == "plotly":
+            return pio.from_json(value[1])
+        if isinstance(value, tuple) and value[0] == "frame":
+            return value[1]
+        return value
+
+    for method, args, kwargs in outputs:
+        if method in REPLAYABLE:
+            getattr(st, method)(*[restore(a) for a in args], **{k: restore(v) for k, v in kwargs.items()})
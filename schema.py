@@ -0,0 +1,108 @@
+import pandas as pd
+
+# --- SCHÉMA DES DATAFRAMES ---
+# Les réponses Supabase arrivent en listes de dicts : sans typage, pandas garde tout en objets Python.
+# Ici on aplatit la jointure inventory(...) au chargement, on passe les colonnes à peu de valeurs
+# distinctes en "category", les montants/quantités en entiers 32 bits, et created_at en datetime.
+
+ORDER_CATEGORIES = ['status', 'marketing_source', 'product_id', 'product_name']
+ORDER_INTEGERS = ['quantity_sold', 'total_amount_cfa', 'unit_buy_cost_at_sale', 'stock_quantity', 'buy_price_cfa']
+INVENTORY_INTEGERS = ['quantity', 'buy_price_cfa', 'sell_price_cfa']
+MOVEMENT_COLUMNS = ['id', 'created_at', 'product_id', 'kind', 'delta', 'quantity_after', 'order_id', 'unit_buy_cost', 'note']
+MOVEMENT_INTEGERS = ['delta', 'quantity_after', 'unit_buy_cost']
+
+# Colonnes de l'embedding inventory(...) -> nom à plat dans la table des commandes
+EMBEDDED_INVENTORY = {
+    'product_name': 'product_name',
+    'quantity': 'stock_quantity',
+    'buy_price_cfa': 'buy_price_cfa',
+}
+
+
+def _to_int32(series):
+    # int32 suffit pour des CFA et des quantités ; "Int32" (nullable) s'il manque des valeurs
+    values = pd.to_numeric(series, errors='coerce')
+    return values.astype('Int32' if values.isna().any() else 'int32')
+
+
+def _to_category(series):
+    return series.astype('category')
+
+
+def cast_orders(df):
+    # Types compacts sur une table de commandes déjà à plat (réutilisable après un pd.concat)
+    if df.empty:
+        return df
+    df = df.copy()
+    if 'created_at' in df:
+        df['created_at'] = pd.to_datetime(df['created_at'], utc=True, format='ISO8601')
+    for col in ORDER_CATEGORIES:
+        if col in df:
+            df[col] = _to_category(df[col])
+    for col in ORDER_INTEGERS:
+        if col in df:
+            df[col] = _to_int32(df[col])
+    return df
+
+
+def orders_frame(rows):
+    # Lignes de "orders" (avec ou sans embedding inventory(...)) -> DataFrame à plat et typée
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    if 'inventory' in df:
+        embedded = pd.DataFrame([inv or {} for inv in df.pop('inventory')], index=df.index)
+        for src, dst in EMBEDDED_INVENTORY.items():
+            if src in embedded:
+                df[dst] = embedded[src]
+        if 'product_name' in df:
+            df['product_name'] = df['product_name'].fillna("Produit Inconnu")
+    return cast_orders(df)
+
+
+def inventory_frame(rows):
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    for col in INVENTORY_INTEGERS:
+        if col in df:
+            df[col] = _to_int32(df[col])
+    return df
+
+
+def traffic_frame(rows):
+    # Comptes agrégés (dimension, valeur, visites) renvoyés par traffic_breakdown
+    df = pd.DataFrame(rows, columns=["dimension", "value", "visits"])
+    df['dimension'] = _to_category(df['dimension'])
+    df['visits'] = pd.to_numeric(df['visits']).astype('int64')
+    return df
+
+
+def movements_frame(rows):
+    # Lignes de stock_movements (journal du stock)
+    df = pd.DataFrame(rows, columns=MOVEMENT_COLUMNS)
+    df['created_at'] = pd.to_datetime(df['created_at'], utc=True, format='ISO8601')
+    df['kind'] = _to_category(df['kind'])
+    for col in MOVEMENT_INTEGERS:
+        df[col] = _to_int32(df[col])
+    df['order_id'] = pd.to_numeric(df['order_id']).astype('Int64')
+    return df
+
+
+def stock_frame(rows):
+    # Stock par SKU à une date (RPC stock_at) ; "valeur" = quantité × prix d'achat
+    df = pd.DataFrame(rows, columns=['product_id', 'quantity', 'buy_price_cfa'])
+    df['quantity'] = pd.to_numeric(df['quantity']).astype('int64')
+    df['buy_price_cfa'] = pd.to_numeric(df['buy_price_cfa']).fillna(0).astype('int64')
+    df['valeur'] = df['quantity'] * df['buy_price_cfa']
+    return df
+
+
+def monthly_frame(rows, keys, totals):
+    # Agrégats mensuels (pnl_*_monthly) : mois en date, totaux en int64 (quelques centaines de
+    # lignes : les clés restent en texte, sans catégories)
+    df = pd.DataFrame(rows, columns=['month', *keys, *totals])
+    df['month'] = pd.to_datetime(df['month']).dt.date
+    for col in totals:
+        df[col] = pd.to_numeric(df[col]).astype('int64')
+    return df
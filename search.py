@@ -0,0 +1,198 @@
+import bisect
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+import streamlit as st
+
+from data import init_connection, table_generation, get_inventory, get_orders_by_ids, get_order_keys_after,\
+    KEYS_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+SEARCH_LIMIT = 200
+REFRESH_INTERVAL = 15  # secondes entre deux rattrapages des nouvelles commandes
+
+
+# --- NORMALISATION ---
+def normalize_text(value):
+    # Minuscules, sans accents, espaces compactés : "Crème  Éclat" -> "creme eclat"
+    value = unicodedata.normalize("NFKD", str(value or ""))
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+
+def normalize_phone(value):
+    # Garde les chiffres et retire l'indicatif ivoirien : "+225 07 07..." -> "0707..."
+    digits = re.sub(r"\D", "", str(value or ""))
+    if digits.startswith("00225"):
+        digits = digits[5:]
+    elif digits.startswith("225") and len(digits) > 10:
+        digits = digits[3:]
+    return digits
+
+
+def trigrams(value):
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class _FieldIndex:
+    # Index trigramme + liste triée pour les préfixes courts (1-2 caractères)
+    def __init__(self):
+        self.grams = {}   # trigramme -> {clé}
+        self.values = {}  # clé -> valeur normalisée
+        self.sorted = []  # [(valeur, clé)] pour la recherche par préfixe
+
+    def add(self, pairs):
+        pairs = [(value, key) for key, value in pairs if value]
+        for value, key in pairs:
+            self.values[key] = value
+            for gram in trigrams(value):
+                self.grams.setdefault(gram, set()).add(key)
+        # Timsort fusionne en temps quasi linéaire une liste déjà triée et un lot trié
+        self.sorted.extend(sorted(pairs))
+        self.sorted.sort()
+
+    def find(self, term):
+        if not term:
+            return set()
+        if len(term) < 3:
+            start = bisect.bisect_left(self.sorted, (term,))
+            found = set()
+            for value, key in self.sorted[start:]:
+                if not value.startswith(term):
+                    break
+                found.add(key)
+            return found
+        # Intersection des listes de postings, la plus courte d'abord, puis vérification
+        postings = sorted((self.grams.get(g, set()) for g in trigrams(term)), key=len)
+        if not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return set()
+        return {key for key in candidates if term in self.values[key]}
+
+
+class OrderSearchIndex:
+    # Index en mémoire sur le téléphone, la réf et le nom du produit des commandes.
+    # Ces champs ne changent pas après création : un filigrane (created_at, id) suffit
+    # pour le maintenir à jour en ne chargeant que les nouvelles commandes.
+    # Construit en arrière-plan au démarrage (warm) : tant qu'il n'est pas prêt, les recherches
+    # passent par la RPC search_orders. Les pages sont lues hors du verrou, qui ne protège que
+    # l'ajout des lignes reçues et les recherches (quelques millisecondes).
+    def __init__(self):
+        self.lock = threading.Lock()        # structures de l'index
+        self.refreshing = threading.Lock()  # un seul rattrapage à la fois, sans bloquer les recherches
+        self.ready = False
+        self.phones = _FieldIndex()
+        self.refs = _FieldIndex()
+        self.products = _FieldIndex()  # clé = product_id
+        self.by_product = {}           # product_id -> {order_id}
+        self.created = {}              # order_id -> created_at (pour trier les résultats)
+        self.cursor = None
+        self.refreshed_at = 0
+        self.generation = (None, None)
+
+    def add(self, rows):
+        rows = [row for row in rows if row['id'] not in self.created]
+        for row in rows:
+            self.created[row['id']] = row['created_at']
+            self.by_product.setdefault(row.get('product_id'), set()).add(row['id'])
+        self.phones.add((row['id'], normalize_phone(row.get('customer_phone'))) for row in rows)
+        self.refs.add((row['id'], normalize_text(row.get('order_ref')).lstrip("#")) for row in rows)
+        if rows:
+            self.cursor = (rows[-1]['created_at'], rows[-1]['id'])
+
+    def index_products(self, df_inv):
+        # Le catalogue est petit : on le réindexe entièrement quand il change
+        self.products = _FieldIndex()
+        if not df_inv.empty:
+            self.products.add((pid, normalize_text(name)) for pid, name in zip(df_inv['id'], df_inv['product_name']))
+
+    def refresh(self, force=False):
+        # Rattrape les nouvelles commandes (et le catalogue s'il a changé). Si un autre thread s'en
+        # occupe déjà, on n'attend pas : la recherche se fait sur l'index tel qu'il est.
+        generation = (table_generation("orders"), table_generation("inventory"))
+        if not force and generation == self.generation and time.monotonic() - self.refreshed_at < REFRESH_INTERVAL:
+            return
+        if not self.refreshing.acquire(blocking=False):
+            return
+        try:
+            while True:
+                with self.lock:
+                    cursor = self.cursor
+                rows = get_order_keys_after(cursor)
+                with self.lock:
+                    self.add(rows)
+                if len(rows) < KEYS_PAGE_SIZE:
+                    break
+            if generation[1] != self.generation[1]:
+                df_inv = get_inventory()
+                with self.lock:
+                    self.index_products(df_inv)
+            self.generation = generation
+            self.refreshed_at = time.monotonic()
+            self.ready = True
+        finally:
+            self.refreshing.release()
+
+    def warm(self):
+        # Premier chargement complet, lancé dans un thread au démarrage
+        started = time.monotonic()
+        try:
+            self.refresh(force=True)
+            logger.info("index de recherche prêt : %d commandes en %.1f s", len(self.created), time.monotonic() - started)
+        except Exception:
+            logger.exception("index de recherche : chargement interrompu, recherches via Postgres")
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        text = normalize_text(query).lstrip("#")
+        found = self.refs.find(text)
+        # Un numéro saisi avec espaces ou indicatif (+225...) reste trouvable
+        phone = normalize_phone(query)
+        if phone and not re.search(r"[a-z]", text):
+            found |= self.phones.find(phone)
+        for product_id in self.products.find(text):
+            found |= self.by_product.get(product_id, set())
+        return heapq.nlargest(limit, found, key=lambda i: (self.created[i], i))
+
+
+def _search_backend():
+    return st.secrets.get("search", {}).get("backend", "index")
+
+
+@st.cache_resource
+def get_search_index():
+    # Un index par processus, construit en arrière-plan dès sa création (appelée au démarrage par app.py)
+    index = OrderSearchIndex()
+    if _search_backend() != "postgres":
+        threading.Thread(target=index.warm, name="search-index", daemon=True).start()
+    return index
+
+
+def _search_postgres(query, limit):
+    # Voir sql/search_orders.sql (pg_trgm)
+    response = init_connection().rpc("search_orders", {"p_query": query, "p_limit": limit}).execute()
+    return [row['id'] for row in response.data]
+
+
+def search_orders(query, limit=SEARCH_LIMIT):
+    # Renvoie les commandes (lignes complètes) qui correspondent, les plus récentes d'abord
+    if not query.strip():
+        return get_orders_by_ids(())
+    index = get_search_index()
+    if _search_backend() == "postgres" or not index.ready:
+        # Index pas encore construit (démarrage) : Postgres répond à sa place
+        order_ids = _search_postgres(query, limit)
+    else:
+        index.refresh()
+        with index.lock:
+            order_ids = index.search(query, limit)
+    return get_orders_by_ids(tuple(order_ids))
@@ -0,0 +1,50 @@
+-- Validation (LIVRÉ) d'un lot de commandes en une seule transaction, sur le modèle de process_sale.
+-- Pour chaque commande : décrément du stock, coût d'achat figé, statut "Livré".
+-- Renvoie un tableau [{order_id, success, message}] dans l'ordre des ids reçus.
+-- Chaque décrément est noté "vente" (avec l'id de commande) dans stock_movements (sql/stock_ledger.sql).
+-- process_sale doit poser les mêmes réglages avant son update du stock.
+
+create or replace function deliver_orders(p_order_ids bigint[])
+returns jsonb
+language plpgsql
+as $$
+declare
+  v_id bigint;
+  v_order orders%rowtype;
+  v_stock int;
+  v_buy int;
+  v_results jsonb := '[]'::jsonb;
+begin
+  -- Verrouille les produits du lot dans un ordre stable : deux opérateurs qui valident
+  -- le même SKU s'attendent au lieu de s'écraser, sans risque d'interblocage.
+  perform 1
+  from inventory
+  where id in (select product_id from orders where id = any(p_order_ids))
+  order by id
+  for update;
+
+  foreach v_id in array p_order_ids loop
+    select * into v_order from orders where id = v_id for update;
+
+    if not found then
+      v_results := v_results || jsonb_build_object('order_id', v_id, 'success', false, 'message', 'Commande introuvable');
+    elsif v_order.status in ('Livré', 'Annulé (Client)', 'Annulé (Stock)') then
+      v_results := v_results || jsonb_build_object('order_id', v_id, 'success', false, 'message', 'Déjà terminée (' || v_order.status || ')');
+    else
+      select quantity, buy_price_cfa into v_stock, v_buy from inventory where id = v_order.product_id;
+
+      if v_stock is null or v_stock < v_order.quantity_sold then
+        v_results := v_results || jsonb_build_object('order_id', v_id, 'success', false, 'message', 'Stock insuffisant (' || coalesce(v_stock, 0) || ')');
+      else
+        perform set_config('app.stock_reason', 'vente', true);
+        perform set_config('app.stock_order_id', v_id::text, true);
+        update inventory set quantity = quantity - v_order.quantity_sold where id = v_order.product_id;
+        update orders set status = 'Livré', unit_buy_cost_at_sale = v_buy where id = v_id;
+        v_results := v_results || jsonb_build_object('order_id', v_id, 'success', true, 'message', 'Livré');
+      end if;
+    end if;
+  end loop;
+
+  return v_results;
+end;
+$$;
@@ -0,0 +1,141 @@
+-- Agrégats mensuels du compte de résultat (page Rentabilité).
+-- La page ne lit ni orders ni cashflow : seulement deux petites tables par mois, tenues à jour
+-- par trigger. Coût d'une page = nombre de mois x produits x sources, quel que soit le volume.
+--
+--   pnl_sales_monthly    : commandes LIVRÉES par mois x produit x source (CA, coût d'achat figé)
+--   pnl_expenses_monthly : dépenses (cashflow SORTIE) par mois x catégorie
+--
+-- Mois en UTC, comme traffic_daily. Une commande compte dans le mois de sa création.
+
+create table if not exists pnl_sales_monthly (
+  month date not null,
+  product_id text not null,
+  source text not null,
+  orders bigint not null default 0,
+  units bigint not null default 0,
+  revenue bigint not null default 0,
+  cost bigint not null default 0,
+  units_without_cost bigint not null default 0,   -- livrées sans unit_buy_cost_at_sale (marge surestimée)
+  primary key (month, product_id, source)
+);
+
+create table if not exists pnl_expenses_monthly (
+  month date not null,
+  category text not null,
+  entries bigint not null default 0,
+  amount bigint not null default 0,
+  primary key (month, category)
+);
+
+
+-- --- VENTES ---
+-- sign = 1 pour ajouter une commande livrée, -1 pour la retirer (avant une modification ou une suppression)
+create or replace function pnl_sales_add(o orders, sign int)
+returns void
+language sql
+as $$
+  insert into pnl_sales_monthly (month, product_id, source, orders, units, revenue, cost, units_without_cost)
+  values (
+    date_trunc('month', o.created_at at time zone 'UTC')::date,
+    o.product_id,
+    coalesce(o.marketing_source, 'Inconnu'),
+    sign,
+    sign * o.quantity_sold,
+    sign * o.total_amount_cfa,
+    sign * o.quantity_sold * coalesce(o.unit_buy_cost_at_sale, 0),
+    case when o.unit_buy_cost_at_sale is null then sign * o.quantity_sold else 0 end
+  )
+  on conflict (month, product_id, source) do update set
+    orders = pnl_sales_monthly.orders + excluded.orders,
+    units = pnl_sales_monthly.units + excluded.units,
+    revenue = pnl_sales_monthly.revenue + excluded.revenue,
+    cost = pnl_sales_monthly.cost + excluded.cost,
+    units_without_cost = pnl_sales_monthly.units_without_cost + excluded.units_without_cost;
+$$;
+
+create or replace function pnl_sales_bump()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') and old.status = 'Livré' then
+    perform pnl_sales_add(old, -1);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') and new.status = 'Livré' then
+    perform pnl_sales_add(new, 1);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists orders_pnl_rollup on orders;
+create trigger orders_pnl_rollup
+  after insert or delete or update of status, created_at, product_id, marketing_source, quantity_sold,
+    total_amount_cfa, unit_buy_cost_at_sale on orders
+  for each row execute function pnl_sales_bump();
+
+
+-- --- DÉPENSES ---
+create or replace function pnl_expenses_add(c cashflow, sign int)
+returns void
+language sql
+as $$
+  insert into pnl_expenses_monthly (month, category, entries, amount)
+  values (
+    date_trunc('month', c.date at time zone 'UTC')::date,
+    coalesce(c.category, 'Autre'),
+    sign,
+    sign * c.amount_cfa
+  )
+  on conflict (month, category) do update set
+    entries = pnl_expenses_monthly.entries + excluded.entries,
+    amount = pnl_expenses_monthly.amount + excluded.amount;
+$$;
+
+create or replace function pnl_expenses_bump()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') and old.type = 'SORTIE' then
+    perform pnl_expenses_add(old, -1);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') and new.type = 'SORTIE' then
+    perform pnl_expenses_add(new, 1);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists cashflow_pnl_rollup on cashflow;
+create trigger cashflow_pnl_rollup
+  after insert or delete or update of type, category, amount_cfa, date on cashflow
+  for each row execute function pnl_expenses_bump();
+
+
+-- Reprise de l'historique (à lancer une fois, avant l'ouverture des triggers)
+insert into pnl_sales_monthly (month, product_id, source, orders, units, revenue, cost, units_without_cost)
+select date_trunc('month', created_at at time zone 'UTC')::date,
+       product_id,
+       coalesce(marketing_source, 'Inconnu'),
+       count(*),
+       sum(quantity_sold),
+       sum(total_amount_cfa),
+       sum(quantity_sold * coalesce(unit_buy_cost_at_sale, 0)),
+       sum(case when unit_buy_cost_at_sale is null then quantity_sold else 0 end)
+from orders
+where status = 'Livré'
+group by 1, 2, 3
+on conflict (month, product_id, source) do update set
+  orders = excluded.orders, units = excluded.units, revenue = excluded.revenue,
+  cost = excluded.cost, units_without_cost = excluded.units_without_cost;
+
+insert into pnl_expenses_monthly (month, category, entries, amount)
+select date_trunc('month', date at time zone 'UTC')::date,
+       coalesce(category, 'Autre'),
+       count(*),
+       sum(amount_cfa)
+from cashflow
+where type = 'SORTIE'
+group by 1, 2
+on conflict (month, category) do update set entries = excluded.entries, amount = excluded.amount;
@@ -0,0 +1,46 @@
+-- Demande journalière par produit pour le réapprovisionnement (replenishment.py).
+-- Une ligne par produit avec un tableau dense d'unités par jour (p_from..p_to, jours sans vente
+-- à 0) : la réponse grossit avec le nombre de produits, pas avec le nombre de commandes.
+-- Demande = unités commandées, sauf annulations du client (une annulation faute de stock est
+-- une vente manquée : elle compte).
+-- Pagination par clé sur product_id (p_after) : PostgREST plafonne le nombre de lignes.
+
+create or replace function product_daily_units(
+  p_from date,
+  p_to date,
+  p_after text default null,
+  p_limit integer default 1000
+)
+returns table (product_id text, units integer[])
+language sql
+stable
+as $$
+  with products as (
+    select distinct o.product_id
+    from orders o
+    where o.created_at >= p_from::timestamp at time zone 'UTC'
+      and o.created_at < (p_to + 1)::timestamp at time zone 'UTC'
+      and o.status <> 'Annulé (Client)'
+      and o.product_id is not null
+      and (p_after is null or o.product_id > p_after)
+    order by o.product_id
+    limit p_limit
+  ),
+  daily as (
+    select o.product_id, (o.created_at at time zone 'UTC')::date as day, sum(o.quantity_sold)::integer as units
+    from orders o
+    join products p using (product_id)
+    where o.created_at >= p_from::timestamp at time zone 'UTC'
+      and o.created_at < (p_to + 1)::timestamp at time zone 'UTC'
+      and o.status <> 'Annulé (Client)'
+    group by 1, 2
+  )
+  select p.product_id,
+         array_agg(coalesce(d.units, 0) order by g.day)
+  from products p
+  cross join generate_series(p_from, p_to, interval '1 day') as g(day)
+  left join daily d on d.product_id = p.product_id and d.day = g.day::date
+  group by p.product_id
+  order by p.product_id;
+$$;
+
@@ -0,0 +1,68 @@
+-- Synchronisation de la réplique locale (replica.py) par filigrane.
+-- orders, inventory et cashflow reçoivent updated_at (mis à jour par trigger à chaque modification) ;
+-- site_traffic n'est jamais modifié : son created_at suffit. Les suppressions sont notées dans
+-- replica_deletions pour être rejouées sur la copie.
+
+-- --- updated_at ---
+create or replace function touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+alter table orders add column if not exists updated_at timestamptz not null default now();
+alter table inventory add column if not exists updated_at timestamptz not null default now();
+alter table cashflow add column if not exists updated_at timestamptz not null default now();
+
+-- Reprise : les lignes existantes partent de leur date de création (inventory n'en a pas toujours)
+update orders set updated_at = created_at;
+update cashflow set updated_at = coalesce(date, updated_at);
+
+drop trigger if exists orders_touch_updated_at on orders;
+create trigger orders_touch_updated_at before update on orders
+  for each row execute function touch_updated_at();
+drop trigger if exists inventory_touch_updated_at on inventory;
+create trigger inventory_touch_updated_at before update on inventory
+  for each row execute function touch_updated_at();
+drop trigger if exists cashflow_touch_updated_at on cashflow;
+create trigger cashflow_touch_updated_at before update on cashflow
+  for each row execute function touch_updated_at();
+
+-- Index de la synchronisation : order by (filigrane, id) à partir du dernier filigrane
+create index if not exists orders_updated_at_idx on orders (updated_at, id);
+create index if not exists inventory_updated_at_idx on inventory (updated_at, id);
+create index if not exists cashflow_updated_at_idx on cashflow (updated_at, id);
+create index if not exists site_traffic_created_at_idx on site_traffic (created_at, id);
+
+-- --- SUPPRESSIONS ---
+create table if not exists replica_deletions (
+  id bigserial primary key,
+  table_name text not null,
+  row_key text not null,
+  deleted_at timestamptz not null default now()
+);
+create index if not exists replica_deletions_table_idx on replica_deletions (table_name, id);
+
+create or replace function note_replica_deletion()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into replica_deletions (table_name, row_key) values (tg_table_name, old.id::text);
+  return old;
+end;
+$$;
+
+drop trigger if exists orders_replica_deletion on orders;
+create trigger orders_replica_deletion after delete on orders
+  for each row execute function note_replica_deletion();
+drop trigger if exists inventory_replica_deletion on inventory;
+create trigger inventory_replica_deletion after delete on inventory
+  for each row execute function note_replica_deletion();
+drop trigger if exists cashflow_replica_deletion on cashflow;
+create trigger cashflow_replica_deletion after delete on cashflow
+  for each row execute function note_replica_deletion();
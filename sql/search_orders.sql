@@ -0,0 +1,62 @@
+-- Recherche de commandes côté Postgres (backend "postgres" de search.py)
+-- Activer dans .streamlit/secrets.toml :
+--   [search]
+--   backend = "postgres"
+
+create extension if not exists pg_trgm;
+create extension if not exists unaccent;
+
+-- Même normalisation que search.normalize_phone : chiffres seuls, sans indicatif 225
+create or replace function normalize_phone(p_phone text)
+returns text
+language sql
+immutable
+as $$
+  select case
+    when d like '00225%' then substr(d, 6)
+    when d like '225%' and length(d) > 10 then substr(d, 4)
+    else d
+  end
+  from (select regexp_replace(coalesce(p_phone, ''), '\D', '', 'g') as d) s;
+$$;
+
+-- unaccent() n'est pas immutable : on l'enveloppe pour pouvoir l'indexer
+create or replace function normalize_text(p_text text)
+returns text
+language sql
+immutable
+as $$
+  select lower(public.unaccent('public.unaccent', coalesce(p_text, '')));
+$$;
+
+create index if not exists orders_phone_trgm
+  on orders using gin (normalize_phone(customer_phone) gin_trgm_ops);
+create index if not exists orders_ref_trgm
+  on orders using gin (normalize_text(order_ref::text) gin_trgm_ops);
+create index if not exists inventory_name_trgm
+  on inventory using gin (normalize_text(product_name) gin_trgm_ops);
+create index if not exists orders_product_created
+  on orders (product_id, created_at desc);
+
+-- Renvoie les ids des commandes qui correspondent, les plus récentes d'abord
+create or replace function search_orders(p_query text, p_limit int default 200)
+returns table (id bigint)
+language sql
+stable
+as $$
+  with q as (
+    select normalize_text(ltrim(p_query, '#')) as text,
+           normalize_phone(p_query) as phone
+  )
+  select o.id
+  from orders o, q
+  where normalize_text(o.order_ref::text) like '%' || q.text || '%'
+     or (q.phone <> '' and q.text !~ '[a-z]'
+         and normalize_phone(o.customer_phone) like '%' || q.phone || '%')
+     or o.product_id in (
+          select i.id from inventory i
+          where normalize_text(i.product_name) like '%' || q.text || '%'
+        )
+  order by o.created_at desc, o.id desc
+  limit p_limit;
+$$;
@@ -0,0 +1,205 @@
+-- Journal des mouvements de stock + photos périodiques (page Stocks : historique par SKU, stock à une date).
+--
+-- Chaque changement de inventory.quantity ajoute une ligne à stock_movements (trigger, jamais de
+-- mise à jour ni de suppression). Le motif vient de la transaction : les RPC qui bougent le stock
+-- posent app.stock_reason (et app.stock_order_id, app.stock_note) avec set_config(..., true) avant
+-- leur update. Un nouveau produit est toujours une "creation" ; sans motif, une modification
+-- est un "ajustement" (formulaire de la page Stocks).
+--
+-- Motifs : creation, vente, annulation (retour remis en stock), ajustement, reassort, suppression.
+-- Une commande en attente ne réserve pas de stock : l'annuler ne crée donc aucun mouvement.
+--
+-- stock_snapshots garde, chaque jour, le stock de chaque SKU à 00:00 UTC. "Stock au JJ/MM HH:MM"
+-- = photo du jour + mouvements depuis minuit : la lecture ne parcourt jamais tout le journal.
+
+create table if not exists stock_movements (
+  id bigserial primary key,
+  product_id text not null,          -- pas de clé étrangère : le journal survit au produit
+  created_at timestamptz not null default now(),
+  delta int not null,
+  quantity_after int not null,
+  kind text not null check (kind in ('creation', 'vente', 'annulation', 'ajustement', 'reassort', 'suppression')),
+  order_id bigint,
+  unit_buy_cost int,
+  note text
+);
+
+create index if not exists stock_movements_product_idx on stock_movements (product_id, created_at desc, id desc);
+create index if not exists stock_movements_created_idx on stock_movements (created_at);
+
+create table if not exists stock_snapshots (
+  day date not null,                 -- stock à 00:00 UTC ce jour-là
+  product_id text not null,
+  quantity int not null,
+  buy_price_cfa int not null,
+  primary key (day, product_id)
+);
+
+
+-- --- TRIGGER : une ligne de journal par changement de stock ---
+create or replace function log_stock_movement()
+returns trigger
+language plpgsql
+as $$
+declare
+  v_reason text := nullif(current_setting('app.stock_reason', true), '');
+  v_order bigint := nullif(current_setting('app.stock_order_id', true), '')::bigint;
+  v_note text := nullif(current_setting('app.stock_note', true), '');
+begin
+  if tg_op = 'INSERT' then
+    if new.quantity <> 0 then
+      insert into stock_movements (product_id, delta, quantity_after, kind, unit_buy_cost, note)
+      values (new.id, new.quantity, new.quantity, 'creation', new.buy_price_cfa, v_note);
+    end if;
+    return new;
+  elsif tg_op = 'UPDATE' then
+    if new.quantity is distinct from old.quantity then
+      insert into stock_movements (product_id, delta, quantity_after, kind, order_id, unit_buy_cost, note)
+      values (new.id, new.quantity - old.quantity, new.quantity, coalesce(v_reason, 'ajustement'), v_order, new.buy_price_cfa, v_note);
+    end if;
+    return new;
+  else
+    if old.quantity <> 0 then
+      insert into stock_movements (product_id, delta, quantity_after, kind, unit_buy_cost)
+      values (old.id, -old.quantity, 0, 'suppression', old.buy_price_cfa);
+    end if;
+    return old;
+  end if;
+end;
+$$;
+
+drop trigger if exists inventory_stock_movements on inventory;
+create trigger inventory_stock_movements
+after insert or update of quantity or delete on inventory
+for each row execute function log_stock_movement();
+
+
+-- --- PHOTO JOURNALIÈRE ---
+-- Peut tourner à n'importe quelle heure : le stock de minuit est reconstitué en retirant les
+-- mouvements du jour. Les photos de plus de 90 jours ne sont gardées que le lundi.
+-- Avec pg_cron : select cron.schedule('stock-snapshot', '5 0 * * *', 'select take_stock_snapshot()');
+create or replace function take_stock_snapshot(p_day date default (now() at time zone 'UTC')::date)
+returns int
+language plpgsql
+as $$
+declare
+  v_count int;
+begin
+  insert into stock_snapshots (day, product_id, quantity, buy_price_cfa)
+  select p_day, i.id, i.quantity - coalesce(m.delta, 0), i.buy_price_cfa
+  from inventory i
+  left join (
+    select product_id, sum(delta) as delta
+    from stock_movements
+    where created_at >= p_day::timestamp at time zone 'UTC'
+    group by product_id
+  ) m on m.product_id = i.id
+  on conflict (day, product_id) do update
+    set quantity = excluded.quantity, buy_price_cfa = excluded.buy_price_cfa;
+  get diagnostics v_count = row_count;
+
+  delete from stock_snapshots
+  where day < p_day - 90 and extract(isodow from day) <> 1;
+  return v_count;
+end;
+$$;
+
+
+-- --- STOCK À UNE DATE ---
+-- Photo la plus proche avant p_at + mouvements entre cette photo et p_at.
+-- Sans photo assez ancienne : stock actuel moins les mouvements postérieurs à p_at.
+-- Le prix d'achat est celui du dernier mouvement connu avant p_at (sinon celui de la photo / actuel).
+create or replace function stock_at(p_at timestamptz)
+returns table (product_id text, quantity bigint, buy_price_cfa int)
+language plpgsql
+stable
+as $$
+#variable_conflict use_column
+declare
+  v_day date;
+begin
+  select max(day) into v_day from stock_snapshots where day <= (p_at at time zone 'UTC')::date;
+
+  if v_day is not null then
+    return query
+    with base as (
+      select s.product_id, s.quantity::bigint as quantity, s.buy_price_cfa
+      from stock_snapshots s where s.day = v_day
+      union all
+      select m.product_id, m.delta::bigint, null
+      from stock_movements m
+      where m.created_at >= v_day::timestamp at time zone 'UTC' and m.created_at <= p_at
+    ),
+    last_cost as (
+      select distinct on (m.product_id) m.product_id, m.unit_buy_cost
+      from stock_movements m
+      where m.created_at >= v_day::timestamp at time zone 'UTC' and m.created_at <= p_at
+      order by m.product_id, m.created_at desc, m.id desc
+    )
+    select b.product_id, sum(b.quantity)::bigint,
+           coalesce(max(c.unit_buy_cost), max(b.buy_price_cfa))::int
+    from base b left join last_cost c using (product_id)
+    group by b.product_id
+    having sum(b.quantity) <> 0;
+  else
+    return query
+    select i.id, (i.quantity - coalesce(sum(m.delta), 0))::bigint, i.buy_price_cfa
+    from inventory i
+    left join stock_movements m on m.product_id = i.id and m.created_at > p_at
+    group by i.id, i.quantity, i.buy_price_cfa
+    having i.quantity - coalesce(sum(m.delta), 0) <> 0;
+  end if;
+end;
+$$;
+
+
+-- --- IMPORT EN MASSE AVEC MOTIF ---
+-- Même upsert que celui de l'import de catalogue, mais les mouvements sont notés "reassort"
+-- (quantités ajoutées) ou "ajustement" (quantités remplacées), avec le nom du fichier en note.
+-- En "reassort", p_rows porte les quantités à AJOUTER : elles s'appliquent au stock du moment,
+-- lignes verrouillées, comme deliver_orders. Une vente validée pendant l'import n'est donc pas
+-- écrasée, et une ligne dont le stock final serait négatif est refusée ici, pas sur l'aperçu.
+-- Renvoie {written, rejected: [{id, message}]}.
+drop function if exists import_inventory(jsonb, text, text);
+create or replace function import_inventory(p_rows jsonb, p_reason text default 'ajustement', p_note text default null)
+returns jsonb
+language plpgsql
+as $$
+declare
+  v_count int;
+  v_rejected jsonb := '[]'::jsonb;
+begin
+  perform set_config('app.stock_reason', p_reason, true);
+  perform set_config('app.stock_note', coalesce(p_note, ''), true);
+
+  if p_reason = 'reassort' then
+    with r as (
+      select * from jsonb_to_recordset(p_rows) as r(id text, quantity int)
+    ), locked as (
+      select i.id, i.quantity from inventory i join r using (id) for update of i
+    )
+    select coalesce(jsonb_agg(jsonb_build_object(
+             'id', r.id, 'message', 'stock final négatif (' || (coalesce(l.quantity, 0) + r.quantity) || ')')), '[]'::jsonb)
+    into v_rejected
+    from r left join locked l using (id)
+    where coalesce(l.quantity, 0) + r.quantity < 0;
+
+    insert into inventory (id, product_name, quantity, buy_price_cfa, sell_price_cfa)
+    select r.id, r.product_name, r.quantity, r.buy_price_cfa, r.sell_price_cfa
+    from jsonb_to_recordset(p_rows) as r(id text, product_name text, quantity int, buy_price_cfa int, sell_price_cfa int)
+    where not exists (select 1 from jsonb_array_elements(v_rejected) x where x->>'id' = r.id)
+    on conflict (id) do update
+      set product_name = excluded.product_name, quantity = inventory.quantity + excluded.quantity,
+          buy_price_cfa = excluded.buy_price_cfa, sell_price_cfa = excluded.sell_price_cfa;
+  else
+    insert into inventory (id, product_name, quantity, buy_price_cfa, sell_price_cfa)
+    select r.id, r.product_name, r.quantity, r.buy_price_cfa, r.sell_price_cfa
+    from jsonb_to_recordset(p_rows) as r(id text, product_name text, quantity int, buy_price_cfa int, sell_price_cfa int)
+    on conflict (id) do update
+      set product_name = excluded.product_name, quantity = excluded.quantity,
+          buy_price_cfa = excluded.buy_price_cfa, sell_price_cfa = excluded.sell_price_cfa;
+  end if;
+  get diagnostics v_count = row_count;
+  return jsonb_build_object('written', v_count, 'rejected', v_rejected);
+end;
+$$;
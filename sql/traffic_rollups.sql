@@ -0,0 +1,77 @@
+-- Agrégats du trafic pour la page Analytics.
+-- La page ne lit plus site_traffic : seulement traffic_daily (jour x source x appareil x OS),
+-- tenu à jour par trigger à chaque visite enregistrée.
+
+create table if not exists traffic_daily (
+  day date not null,
+  source text not null,
+  device_type text not null,
+  os text not null,
+  visits bigint not null default 0,
+  primary key (day, source, device_type, os)
+);
+
+create or replace function traffic_daily_bump()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into traffic_daily (day, source, device_type, os, visits)
+  values (
+    (new.created_at at time zone 'UTC')::date,
+    coalesce(new.source, 'Inconnu'),
+    coalesce(new.device_type, 'Inconnu'),
+    coalesce(new.os, 'Inconnu'),
+    1
+  )
+  on conflict (day, source, device_type, os)
+  do update set visits = traffic_daily.visits + 1;
+  return new;
+end;
+$$;
+
+drop trigger if exists site_traffic_rollup on site_traffic;
+create trigger site_traffic_rollup
+  after insert on site_traffic
+  for each row execute function traffic_daily_bump();
+
+-- Reprise de l'historique (à lancer une fois, avant l'ouverture du trigger au trafic)
+insert into traffic_daily (day, source, device_type, os, visits)
+select (created_at at time zone 'UTC')::date,
+       coalesce(source, 'Inconnu'),
+       coalesce(device_type, 'Inconnu'),
+       coalesce(os, 'Inconnu'),
+       count(*)
+from site_traffic
+group by 1, 2, 3, 4
+on conflict (day, source, device_type, os) do update set visits = excluded.visits;
+
+-- Comptes groupés par dimension, calculés sur les agrégats journaliers
+create or replace function traffic_breakdown(p_from date default null, p_to date default null)
+returns table (dimension text, value text, visits bigint)
+language sql
+stable
+as $$
+  select case when grouping(source) = 0 then 'source'
+              when grouping(device_type) = 0 then 'device_type'
+              else 'os' end,
+         coalesce(source, device_type, os),
+         sum(visits)::bigint
+  from traffic_daily
+  where (p_from is null or day >= p_from)
+    and (p_to is null or day <= p_to)
+  group by grouping sets ((source), (device_type), (os));
+$$;
+
+-- Visites par jour (courbe de conversion de la page Analytics)
+create or replace function traffic_daily_visits(p_from date, p_to date)
+returns table (day date, visits bigint)
+language sql
+stable
+as $$
+  select day, sum(visits)::bigint
+  from traffic_daily
+  where day between p_from and p_to
+  group by day
+  order by day;
+$$;
@@ -0,0 +1,59 @@
+-- Écritures différées (outbox.py) : chaque écriture envoyée par la file locale porte une clé
+-- d'idempotence. Un lot renvoyé (réponse perdue, coupure réseau) ne crée aucun doublon.
+
+-- Dépenses : upsert on_conflict=idempotency_key, ignore_duplicates
+alter table cashflow add column if not exists idempotency_key text;
+create unique index if not exists cashflow_idempotency_key on cashflow (idempotency_key);
+
+-- Ventes manuelles : résultat de process_sale gardé par clé, renvoyé tel quel si la clé revient
+create table if not exists applied_writes (
+  key text primary key,
+  result jsonb not null,
+  created_at timestamptz not null default now()
+);
+
+-- Lot de ventes [{key, phone, product_id, qty, total, source}] -> [{key, success, message}]
+-- Chaque vente tourne dans son propre bloc (sous-transaction) : une vente qui lève une erreur est
+-- annulée seule et renvoyée en échec (message de l'erreur), les autres ventes du lot sont appliquées.
+-- Seules les ventes réussies sont retenues dans applied_writes : un refus (stock insuffisant...)
+-- ou une erreur n'a rien écrit, la même clé peut donc être relancée ("Réessayer") et aboutir.
+create or replace function process_sales_once(p_sales jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+  v_sale jsonb;
+  v_result jsonb;
+  v_results jsonb := '[]'::jsonb;
+begin
+  for v_sale in select * from jsonb_array_elements(p_sales) loop
+    select result into v_result from applied_writes where key = v_sale->>'key';
+    if not found then
+      begin
+        -- Journal du stock (sql/stock_ledger.sql) : la sortie de stock est une vente, pas un
+        -- ajustement. La commande n'est créée qu'après le stock : pas d'order_id à poser ici.
+        perform set_config('app.stock_reason', 'vente', true);
+        perform set_config('app.stock_order_id', '', true);
+        perform set_config('app.stock_note', 'Vente manuelle', true);
+        v_result := process_sale(
+          p_phone => v_sale->>'phone',
+          p_product_id => v_sale->>'product_id',
+          p_qty => (v_sale->>'qty')::int,
+          p_total => (v_sale->>'total')::int,
+          p_source => v_sale->>'source'
+        );
+        if (v_result->>'success')::boolean then
+          insert into applied_writes (key, result) values (v_sale->>'key', v_result);
+        end if;
+      exception when others then
+        v_result := jsonb_build_object('success', false, 'message', SQLERRM);
+      end;
+    end if;
+    v_results := v_results || (jsonb_build_object('key', v_sale->>'key') || v_result);
+  end loop;
+  return v_results;
+end;
+$$;
+
+-- Les clés ne servent que le temps des reprises : purge possible après quelques jours
+-- (pg_cron : select cron.schedule('applied-writes', '0 3 * * *', $$delete from applied_writes where created_at < now() - interval '7 days'$$);)